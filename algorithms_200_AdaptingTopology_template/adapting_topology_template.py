@@ -1,8 +1,16 @@
 #! /usr/bin/python3
 
+import collections
 import sys
+import threading
+
+import numpy as np
+
+from qhack.lazy import lazy_import
+
 #from pennylane import numpy as np
-import pennylane as qml
+#PennyLane is only needed to build the CNOT that carries the wires, so defer its import until then
+qml = lazy_import("pennylane")
 
 graph = {
     0: [1],
@@ -16,8 +24,92 @@ graph = {
     8: [4],
 }
 
-#initialize global variable that counts minimum number of swap gates required to connect two qubits
-minNumSwaps=0
+#coupling tables computed so far, most recently used last: id(graph) -> _Tables
+_TABLES = collections.OrderedDict()
+_TABLES_LOCK = threading.Lock()
+TABLE_CACHE_SIZE = 8
+
+
+class _Tables:
+    """Distance table of one coupling graph, and the routing arrays once ``route`` needs them."""
+
+    def __init__(self, coupling):
+        #holding the graph keeps its id from being reused by another object while the entry lives
+        self.graph = coupling
+        self.shape = _shape(coupling)
+        self.distances = _all_pairs_distances(coupling)
+        self.arrays = None
+
+
+def _all_pairs_distances(coupling):
+    table = {}
+
+    #one breadth-first search per qubit gives its distance to every other qubit
+    for source in coupling:
+        distance = {source: 0}
+        queue = collections.deque([source])
+        while queue:
+            node = queue.popleft()
+            for neighbour in coupling.get(node, ()):
+                if neighbour not in distance:
+                    distance[neighbour] = distance[node] + 1
+                    queue.append(neighbour)
+        table[source] = distance
+
+    return table
+
+
+def _shape(coupling):
+    #number of qubits and total degree: cheap to compare, and changed by adding or removing
+    #qubits or couplings
+    return len(coupling), sum(len(neighbours) for neighbours in coupling.values())
+
+
+def _tables(coupling):
+    key = id(coupling)
+    with _TABLES_LOCK:
+        tables = _TABLES.get(key)
+        if tables is None or tables.graph is not coupling or tables.shape != _shape(coupling):
+            tables = _TABLES[key] = _Tables(coupling)
+            if len(_TABLES) > TABLE_CACHE_SIZE:
+                _TABLES.popitem(last=False)
+        else:
+            _TABLES.move_to_end(key)
+        return tables
+
+
+def invalidate(coupling=None):
+    """Forgets the cached tables of a coupling graph, for in-place edits that keep the number
+    of qubits and couplings, e.g. moving a coupling from one pair of qubits to another.
+
+    Args:
+        - coupling (dict): the edited adjacency lists; every graph's tables are dropped if None
+    """
+
+    with _TABLES_LOCK:
+        if coupling is None:
+            _TABLES.clear()
+        else:
+            _TABLES.pop(id(coupling), None)
+
+
+def distances(coupling=None):
+    """All-pairs shortest-path distances of a coupling graph.
+
+    The table is computed on the first call for a graph and then looked up by the graph's
+    identity; later calls only check that the graph still has as many qubits and couplings.
+    Adding or removing qubits or couplings in place rebuilds the table on the next call, and
+    ``invalidate`` covers edits that keep both counts. Safe to call from several threads.
+
+    Args:
+        - coupling (dict): adjacency lists, defaults to the module-level graph
+
+    Returns:
+        - (dict(dict(int))): table[a][b] is the number of edges between qubits a and b; qubits
+        that cannot reach each other are missing from each other's rows
+    """
+
+    return _tables(graph if coupling is None else coupling).distances
 
 
 def n_swaps(cnot):
@@ -33,49 +125,202 @@ def n_swaps(cnot):
 
     # QHACK #
 
-    #controlList is a *list* of all the qubits we need to check to see if they're connected to target qubit
-    #the outer set of square parentheses converts cnot.wires[0] from an integer to a list
-    controlList=[cnot.wires[0]]
-    target=cnot.wires[1]    
-  
-    global minNumSwaps
-    
-    #check to see if any qubits in the control list are connected to target qubit
-    testForConnection(controlList,target)
-
-    return minNumSwaps
-
-#function that tests if a qubit is connected to target qubit        
-def testForConnection(localControlList,localTarget):
-    newLocalControlList=[]
-          
-    #loop through all qubits in localControlList
-    for i in range(len(localControlList)):
-        for j in range(len(graph[localControlList[i]])):        
-            
-            #test to see if a qubit in list of control qubits is same as target qubit
-            if graph[localControlList[i]][j]==localTarget:
-                return
-                
-            #build up a list of qubits that are connected to qubits in localControlList 
-            newLocalControlList.append(graph[localControlList[i]][j])
-                
-    #if we reach here, we've looked through all the qubits in localControlList & none are directly connected to target node
-    #Repeat search process for at least one more iteration
-    
-    global minNumSwaps
-    
-    #increment minimum number of swaps by two as we need to swap two qubit states (+1) & then swap them back (+1) 
-    minNumSwaps+=2
-    
-    #test to see if any of qubits in new controlList are directly connected to target qubit
-    testForConnection(newLocalControlList,localTarget)          
-    
-    return    
+    control, target = cnot.wires[0], cnot.wires[1]
+    distance = distances().get(control, {}).get(target)
+    if distance is None:
+        raise ValueError(f"qubits {control} and {target} are not connected in the coupling graph")
+
+    #the control is swapped along the path until it neighbours the target (distance - 1 swaps),
+    #then swapped back, so two swaps per intermediate qubit
+    return 2 * max(distance - 1, 0)
+
     # QHACK #
-    
 
 
+
+Routing = collections.namedtuple("Routing", ["gates", "swaps", "depth", "layout"])
+
+
+def _coupling_arrays(coupling):
+    tables = _tables(coupling)
+    if tables.arrays is None:
+        tables.arrays = _build_arrays(coupling, tables.distances)
+    return tables.arrays
+
+
+def _build_arrays(coupling, table):
+    #qubits are numbered in the order of the graph; padded neighbour and edge-id tables let
+    #the SWAP scores of all candidate edges be computed with a few array operations
+    nodes = list(coupling)
+    index = {node: k for k, node in enumerate(nodes)}
+    unreachable = len(nodes) ** 2
+
+    matrix = np.full((len(nodes), len(nodes)), unreachable, dtype=np.int64)
+    for a, row in table.items():
+        for b, distance in row.items():
+            matrix[index[a], index[b]] = distance
+
+    degree = max((len(neighbours) for neighbours in coupling.values()), default=0)
+    neighbours = np.full((len(nodes), degree), -1, dtype=np.int64)
+    edge_ids = np.full((len(nodes), degree), -1, dtype=np.int64)
+    edges = {}
+    for node, adjacent in coupling.items():
+        for k, other in enumerate(adjacent):
+            key = frozenset((index[node], index[other]))
+            neighbours[index[node], k] = index[other]
+            edge_ids[index[node], k] = edges.setdefault(key, len(edges))
+
+    endpoints = np.array([sorted(key) for key in edges], dtype=np.int64).reshape(-1, 2)
+    return nodes, index, matrix, neighbours, edge_ids, endpoints
+
+
+def _gate_wires(gate):
+    return tuple(gate.wires) if hasattr(gate, "wires") else tuple(gate)
+
+
+def _dependencies(pairs):
+    #a gate can only run after the previous gate on each of its qubits
+    last_on, predecessors, successors = {}, [], [[] for _ in pairs]
+    for i, wires in enumerate(pairs):
+        before = {last_on[q] for q in wires if q in last_on}
+        for j in before:
+            successors[j].append(i)
+        predecessors.append(len(before))
+        last_on.update((q, i) for q in wires)
+    return predecessors, successors
+
+
+def _circuit_depth(gates):
+    level = {}
+    for _, (a, b) in gates:
+        level[a] = level[b] = max(level.get(a, 0), level.get(b, 0)) + 1
+    return max(level.values(), default=0)
+
+
+def _moves(position, distance, matrix, neighbours, edge_ids, weights):
+    #score change of every edge swap that moves one end of a gate, summed per edge
+    moved = neighbours[position]
+    valid = (moved >= 0) & (moved != distance[1][:, None])
+    change = matrix[np.where(valid, moved, 0), distance[1][:, None]] - distance[0][:, None]
+    return edge_ids[position][valid], (weights[:, None] * change)[valid]
+
+
+def route(circuit, coupling=None, lookahead=20, weight=0.5, decay=0.001):
+    """Inserts SWAPs into a circuit of CNOTs so every CNOT acts on neighbouring qubits.
+
+    Uses the SABRE heuristic: every CNOT whose qubits are neighbours is executed as soon as its
+    predecessors have been, and otherwise the SWAP on an edge touching the blocked gates is
+    chosen that most reduces their mean distance, plus `weight` times the mean distance of the
+    next `lookahead` gates. Qubits swapped recently are penalised by `decay` so the search
+    spreads out, and if no gate has run for a while the first blocked gate is routed along a
+    shortest path.
+
+    Args:
+        - circuit (iterable): CNOTs as qml.Operation or (control, target) pairs of qubits of the coupling graph
+        - coupling (dict): adjacency lists, defaults to the module-level graph
+        - lookahead (int): number of upcoming gates that take part in the SWAP choice
+        - weight (float): weight of the upcoming gates relative to the blocked ones
+        - decay (float): penalty added to a qubit each time it is swapped
+
+    Returns:
+        - (Routing): the routed gates as ("CNOT" or "SWAP", (physical, physical)) tuples, the number of
+        SWAPs, the depth of the routed circuit and the final layout {qubit: physical qubit}
+    """
+
+    coupling = graph if coupling is None else coupling
+    nodes, index, matrix, neighbours, edge_ids, endpoints = _coupling_arrays(coupling)
+    pairs = np.array([[index[q] for q in _gate_wires(gate)] for gate in circuit], dtype=np.int64).reshape(-1, 2)
+    predecessors, successors = _dependencies([tuple(pair) for pair in pairs.tolist()])
+
+    if len(pairs) and matrix[pairs[:, 0], pairs[:, 1]].max() >= len(nodes):
+        raise ValueError("the circuit has a CNOT between qubits that are not connected in the coupling graph")
+
+    #position[q] is the physical qubit currently holding the state of qubit q, occupant is its inverse
+    position = np.arange(len(nodes))
+    occupant = np.arange(len(nodes))
+    penalty = np.ones(len(nodes))
+    gates = []
+
+    def swap(p, n):
+        occupant[p], occupant[n] = occupant[n], occupant[p]
+        position[occupant[p]], position[occupant[n]] = p, n
+        gates.append(("SWAP", (nodes[p], nodes[n])))
+
+    front = [i for i, count in enumerate(predecessors) if count == 0]
+    stall_limit = 3 * int(matrix.max(initial=0)) if len(nodes) else 0
+    stalled, layer = 0, None
+
+    while front:
+        if layer is None:
+            #upcoming gates, in the order they become ready; only recomputed when the front moves
+            extended, queue, seen = [], collections.deque(front), set(front)
+            while queue and len(extended) < lookahead:
+                for j in successors[queue.popleft()]:
+                    if j not in seen:
+                        seen.add(j)
+                        extended.append(j)
+                        queue.append(j)
+            extended = extended[:lookahead]
+            layer = pairs[front + extended]
+            weights = np.concatenate(
+                [np.full(len(front), 1 / len(front)), np.full(len(extended), weight / max(len(extended), 1))]
+            )
+
+        control, target = position[layer[:, 0]], position[layer[:, 1]]
+        distance = matrix[control, target]
+        executable = [i for i, d in zip(front, distance[: len(front)].tolist()) if d == 1]
+
+        if executable:
+            for i in executable:
+                gates.append(("CNOT", (nodes[position[pairs[i, 0]]], nodes[position[pairs[i, 1]]])))
+                for j in successors[i]:
+                    predecessors[j] -= 1
+                    if predecessors[j] == 0:
+                        front.append(j)
+            done = set(executable)
+            front = [i for i in front if i not in done]
+            penalty[:] = 1
+            stalled, layer = 0, None
+            continue
+
+        if stalled >= stall_limit:
+            #release valve: walk the control of the first blocked gate next to its target
+            a, b = position[pairs[front[0]]]
+            while matrix[a, b] > 1:
+                n = min((n for n in neighbours[a] if n >= 0), key=lambda n: matrix[n, b])
+                swap(a, n)
+                a = n
+            stalled = 0
+            continue
+
+        #the base score is the same for every candidate, only the gates on the two swapped qubits change
+        base = float(weights @ distance)
+        ids_control, change_control = _moves(control, (distance, target), matrix, neighbours, edge_ids, weights)
+        ids_target, change_target = _moves(target, (distance, control), matrix, neighbours, edge_ids, weights)
+        delta = np.bincount(
+            np.concatenate([ids_control, ids_target]),
+            weights=np.concatenate([change_control, change_target]),
+            minlength=len(endpoints),
+        )
+
+        #SABRE only considers edges touching a qubit of a blocked gate
+        touched = edge_ids[np.concatenate([control[: len(front)], target[: len(front)]])]
+        eligible = np.zeros(len(endpoints), dtype=bool)
+        eligible[touched[touched >= 0]] = True
+        candidates = np.flatnonzero(eligible)
+        p, n = endpoints[candidates, 0], endpoints[candidates, 1]
+        scores = np.maximum(penalty[p], penalty[n]) * (base + delta[candidates])
+        best = int(np.argmin(scores))
+
+        swap(int(p[best]), int(n[best]))
+        penalty[p[best]] += decay
+        penalty[n[best]] += decay
+        stalled += 1
+
+    layout = {nodes[q]: nodes[position[q]] for q in range(len(nodes))}
+    swaps = sum(1 for name, _ in gates if name == "SWAP")
+    return Routing(gates, swaps, _circuit_depth(gates), layout)
+
 if __name__ == "__main__":
     # DO NOT MODIFY anything in this code block
     inputs = sys.stdin.read().split(",")
@@ -1,9 +1,12 @@
 #! /usr/bin/python3
 
 import sys
+import numpy as onp
 from pennylane import numpy as np
 import pennylane as qml
 
+from qhack import cache
+
 
 def qfunc_adder(m, wires):
     """Quantum function capable of adding m units to a basic state given as input.
@@ -16,24 +19,175 @@ def qfunc_adder(m, wires):
     qml.QFT(wires=wires)
 
     # QHACK #
-    pi = 3.14159
 
     for i in range(len(wires)):   
         
         #extra phase directly tied to m value
-        theta=(m/(2**len(wires)))*2*pi
+        theta=(m/(2**len(wires)))*2*np.pi
         
         #multiply theta by an extra factor related to the value i 
         theta*=2**(len(wires)-1-i)  
         
         #add phase to |1> state of i^th qubit
-        qml.PhaseShift(theta,wires=i)
+        qml.PhaseShift(theta,wires=wires[i])
         
     # QHACK #
 
     qml.QFT(wires=wires).inv()
 
 
+
+def to_bits(values, n_wires):
+    """Basis states of n_wires qubits, wire 0 holding the most significant bit.
+
+    Args:
+        - values (int or np.ndarray): integers in [0, 2^n_wires)
+        - n_wires (int): number of wires
+
+    Returns:
+        - (np.ndarray): the bits, with one more axis of length n_wires than values
+    """
+
+    shifts = np.arange(n_wires - 1, -1, -1)
+    return (np.asarray(values, dtype=np.int64)[..., None] >> shifts) & 1
+
+
+def classical_adder(x, m, n_wires):
+    """What qfunc_adder does to the basis state |x>, computed directly as (x + m) mod 2^n_wires.
+
+    Args:
+        - x (int): the input basis state
+        - m (int): units to add
+        - n_wires (int): number of wires
+
+    Returns:
+        - (np.ndarray): the bits of the output basis state, wire 0 first
+    """
+
+    return to_bits((x + m) % 2**n_wires, n_wires)
+
+
+def classical_adder_batch(x, ms, n_wires):
+    """classical_adder for many values of m added to the same register.
+
+    Args:
+        - x (int): the input basis state
+        - ms (list(int)): units to add
+        - n_wires (int): number of wires
+
+    Returns:
+        - (np.ndarray): one row of output bits per value of m
+    """
+
+    return to_bits((x + np.asarray(ms, dtype=np.int64)) % 2**n_wires, n_wires)
+
+
+def _adder_circuit(x, m, n_wires):
+    qml.BasisState(to_bits(x, n_wires), wires=range(n_wires))
+    qfunc_adder(m, range(n_wires))
+    return qml.probs(wires=range(n_wires))
+
+
+def quantum_adder(x, m, n_wires):
+    """Runs qfunc_adder on a simulator, as a cross-check of classical_adder.
+
+    Args:
+        - x (int): the input basis state
+        - m (int): units to add
+        - n_wires (int): number of wires
+
+    Returns:
+        - (np.ndarray): the bits of the most likely output basis state, wire 0 first
+    """
+
+    probs = cache.qnode(_adder_circuit, "default.qubit", wires=n_wires)(x, m, n_wires)
+    return to_bits(int(np.argmax(probs)), n_wires)
+
+
+def _input_state(register, n_wires):
+    if onp.ndim(register) == 0:
+        state = onp.zeros(2**n_wires, dtype=complex)
+        state[int(register)] = 1
+        return state
+    return onp.asarray(register, dtype=complex)
+
+
+def adder_probabilities(register, ms, n_wires, method="fft", max_entries=2**22):
+    """Output distribution of qfunc_adder for every m in ms, applied to the same input register.
+
+    With method "fft" the circuit is simulated once for all m: the QFT and its inverse are
+    applied as FFTs of the state vector, and the PhaseShift layer is applied as one array of
+    phases per m. Rows are processed in chunks of at most max_entries amplitudes. With method
+    "device" one tape per m is built and all of them are run in a single batched execution
+    on "default.qubit".
+
+    Args:
+        - register (int or np.ndarray): input basis state, or a state vector of 2^n_wires amplitudes
+        - ms (list(int)): units to add
+        - n_wires (int): number of wires
+        - method (str): "fft" or "device"
+        - max_entries (int): largest number of amplitudes held at once by the "fft" method
+
+    Returns:
+        - (np.ndarray): one row of 2^n_wires basis-state probabilities per value of m
+    """
+
+    ms = onp.asarray(ms, dtype=float)
+    state = _input_state(register, n_wires)
+
+    if method == "device":
+        dev = cache.device("default.qubit", wires=n_wires)
+        tapes = []
+        for m in ms:
+            with qml.tape.QuantumTape() as tape:
+                qml.QubitStateVector(state, wires=range(n_wires))
+                qfunc_adder(m, range(n_wires))
+                qml.probs(wires=range(n_wires))
+            tapes.append(tape)
+        return onp.array(qml.execute(tapes, dev, gradient_fn=None)).reshape(len(ms), -1)
+
+    if method != "fft":
+        raise ValueError(f"unknown method {method!r}, expected 'fft' or 'device'")
+
+    #the QFT of PennyLane is sqrt(N) times numpy's inverse FFT; the PhaseShift layer multiplies
+    #basis state |k> by exp(2 pi i m k / N)
+    size = 2**n_wires
+    fourier = onp.fft.ifft(state)
+    k = onp.arange(size)
+    probabilities = onp.empty((len(ms), size))
+    chunk = max(1, max_entries // size)
+
+    for start in range(0, len(ms), chunk):
+        phases = onp.exp(2j * onp.pi * onp.outer(ms[start : start + chunk] % size, k) / size)
+        probabilities[start : start + chunk] = onp.abs(onp.fft.fft(fourier * phases, axis=1)) ** 2
+
+    return probabilities
+
+
+def adder_samples(register, ms, n_wires, shots=1, method="fft", seed=None):
+    """Samples of the output register of qfunc_adder for every m in ms.
+
+    Args:
+        - register (int or np.ndarray): input basis state, or a state vector of 2^n_wires amplitudes
+        - ms (list(int)): units to add
+        - n_wires (int): number of wires
+        - shots (int): samples per value of m
+        - method (str): how the probabilities are computed, see adder_probabilities
+        - seed (int): seed of the sampler
+
+    Returns:
+        - (np.ndarray): bits of shape (len(ms), shots, n_wires), wire 0 first
+    """
+
+    probabilities = adder_probabilities(register, ms, n_wires, method)
+    rng = onp.random.default_rng(seed)
+
+    #inverse-CDF sampling of all rows at once
+    cumulative = onp.cumsum(probabilities, axis=1)
+    draws = rng.random((len(probabilities), shots)) * cumulative[:, -1:]
+    outcomes = onp.array([onp.searchsorted(row, draw, side="right") for row, draw in zip(cumulative, draws)])
+    return onp.asarray(to_bits(onp.minimum(outcomes, 2**n_wires - 1), n_wires))
+
 if __name__ == "__main__":
     # DO NOT MODIFY anything in this code block
     inputs = sys.stdin.read().split(",")
@@ -1,11 +1,14 @@
 #! /usr/bin/python3
 
+import concurrent.futures
 import sys
 import pennylane as qml
 from pennylane import numpy as np
 from pennylane.templates import QuantumPhaseEstimation
 #import specialized math functions
+import functools
 import math
+import numpy as onp
 
 
 dev = qml.device("default.qubit", wires=8)
@@ -50,6 +53,160 @@ def grover_operator(indices):
     return np.dot(diffusion_matrix(), oracle_matrix(indices))
 
 
+def oracle_phases(indices, n_target=4):
+    """Diagonal of oracle_matrix: -1 on the marked elements and 1 everywhere else.
+
+    Args:
+        - indices (list(int)): A list of bit indices representing the elements that are map to 1.
+        - n_target (int): number of target wires
+
+    Returns:
+        - (np.ndarray): the 2^n_target oracle phases
+    """
+
+    phases = onp.ones(2**n_target)
+    phases[list(indices)] = -1
+    return phases
+
+
+def apply_grover(states, phases):
+    """Applies grover_operator without building it: the oracle is the diagonal phases and the
+    diffusion 2|s><s| - I is a rank-one update, so one application costs O(2^n_target).
+
+    Args:
+        - states (np.ndarray): state vectors along the last axis
+        - phases (np.ndarray): oracle phases from oracle_phases
+
+    Returns:
+        - (np.ndarray): the Grover operator applied to each state
+    """
+
+    marked = phases * states
+    return 2 * marked.mean(axis=-1, keepdims=True) - marked
+
+
+def qpe_probabilities(indices, n_target=4, n_estimation=4):
+    """Probabilities of the estimation wires returned by circuit, computed matrix-free.
+
+    After the controlled powers of QPE the estimation value k is entangled with G^k|s>, and
+    the inverse QFT makes the probability of outcome j a Fourier sum of the overlaps
+    <G^l s|G^k s>. G is real and orthogonal, so these only depend on d = k - l through
+    c_d = <s|G^d|s>. The c_d take one Grover application each and O(2^n_target) memory.
+
+    Args:
+        - indices (list(int)): A list of bits representing the elements that map to 1.
+        - n_target (int): number of target wires
+        - n_estimation (int): number of estimation wires
+
+    Returns:
+        - (np.ndarray): Probabilities of measuring each computational basis state of the estimation wires
+    """
+
+    phases = oracle_phases(indices, n_target)
+    size = 2**n_estimation
+    uniform = onp.full(2**n_target, 1 / onp.sqrt(2**n_target))
+
+    overlaps = onp.empty(size)
+    state = uniform
+    for d in range(size):
+        overlaps[d] = uniform @ state
+        state = apply_grover(state, phases)
+
+    #P(j) = sum over k, l of exp(-2 pi i j (k - l) / T) c_|k-l| / T^2, grouped by d = |k - l|
+    weights = (size - onp.arange(size)) * overlaps
+    weights[1:] *= 2
+    return onp.fft.fft(weights).real / size**2
+
+
+@functools.lru_cache(maxsize=256)
+def _spectrum(indices, n_target):
+    phases = oracle_phases(indices, n_target)
+    uniform = onp.full(2**n_target, 1 / onp.sqrt(2**n_target))
+
+    #the uniform state only ever reaches span{|s>, G|s>}, so G is diagonalised on that plane
+    grover = apply_grover(uniform, phases)
+    second = grover - (uniform @ grover) * uniform
+    if onp.linalg.norm(second) < 1e-12:
+        return onp.array([onp.angle(uniform @ grover) / (2 * onp.pi)]), onp.ones(1)
+
+    basis = onp.stack([uniform, second / onp.linalg.norm(second)])
+    restricted = basis @ apply_grover(basis, phases).T
+    eigenvalues, eigenvectors = onp.linalg.eig(restricted.T)
+
+    #|s> is the first basis vector, so its weight on each eigenvector is given by the first row
+    #of the inverse eigenvector matrix
+    weights = onp.abs(onp.linalg.inv(eigenvectors)[:, 0]) ** 2
+    return onp.angle(eigenvalues) / (2 * onp.pi), weights / weights.sum()
+
+
+def grover_spectrum(indices, n_target=4):
+    """Eigenphases of the Grover operator seen by the uniform starting state, and their weights.
+
+    The result is cached per oracle, so counting queries with any precision or number of shots
+    reuse it.
+
+    Args:
+        - indices (list(int)): A list of bits representing the elements that map to 1.
+        - n_target (int): number of target wires
+
+    Returns:
+        - (np.ndarray): eigenphases, in turns
+        - (np.ndarray): probability of each eigenphase in the uniform state
+    """
+
+    return _spectrum(tuple(sorted(set(indices))), n_target)
+
+
+def counting_probabilities(indices, n_target=4, n_estimation=4):
+    """Probabilities of the estimation wires after QPE, from the cached spectrum of the Grover operator.
+
+    Each eigenphase phi contributes its weight times the Fejer kernel
+    |sum_k exp(2 pi i k (phi - j / T)) / T|^2 at outcome j, with T = 2^n_estimation.
+
+    Args:
+        - indices (list(int)): A list of bits representing the elements that map to 1.
+        - n_target (int): number of target wires
+        - n_estimation (int): number of estimation wires
+
+    Returns:
+        - (np.ndarray): Probabilities of measuring each computational basis state of the estimation wires
+    """
+
+    eigenphases, weights = grover_spectrum(indices, n_target)
+    size = 2**n_estimation
+
+    #the kernel sums to sin^2(pi T x) / sin^2(pi x), x = phi - j / T, and is T^2 where x is an integer
+    offset = onp.subtract.outer(eigenphases, onp.arange(size) / size)
+    numerator, denominator = onp.sin(onp.pi * size * offset) ** 2, onp.sin(onp.pi * offset) ** 2
+    exact = denominator < 1e-24
+    kernel = onp.where(exact, size**2, numerator / onp.where(exact, 1, denominator))
+    return weights @ kernel / size**2
+
+
+def estimate_solutions(indices, n_target=4, n_estimation=4, shots=None, seed=None):
+    """Quantum counting estimate of the number of marked elements, M = N sin^2(pi j / T).
+
+    Args:
+        - indices (list(int)): A list of bits representing the elements that map to 1.
+        - n_target (int): number of target wires, N = 2^n_target
+        - n_estimation (int): number of estimation wires, T = 2^n_estimation
+        - shots (int): if given, j is the most frequent of this many sampled outcomes instead of the most likely one
+        - seed (int): seed of the sampler
+
+    Returns:
+        - (float): the estimated number of marked elements
+    """
+
+    probabilities = counting_probabilities(indices, n_target, n_estimation)
+
+    if shots is None:
+        outcome = int(onp.argmax(probabilities))
+    else:
+        counts = onp.random.default_rng(seed).multinomial(shots, probabilities / probabilities.sum())
+        outcome = int(onp.argmax(counts))
+
+    return 2**n_target * math.sin(onp.pi * outcome / 2**n_estimation) ** 2
+
 dev = qml.device("default.qubit", wires=8)
 
 @qml.qnode(dev)
@@ -92,15 +249,8 @@ def number_of_solutions(indices):
 
     # QHACK #
     
-    #store list of probabilities of measuring estimation qubits to be in each of the 16 computational basis states in circuitProbs
-    circuitProbs=circuit(indices)
-     
-    """Find the computational basis state with the highest probability.
-    argmax returns the index of the array element with the largest value""" 
-    maxIndex = np.argmax(circuitProbs) 
-            
-    theta = maxIndex*3.14159/8
-    M = 16*(math.sin(theta/2))**2
+    #the most likely outcome j of the estimation qubits gives theta = 2 pi j / 16 and M = 16 sin^2(theta / 2)
+    M = estimate_solutions(indices)
 
     return M
     # QHACK #
@@ -123,6 +273,49 @@ def relative_error(indices):
 
     return rel_err
 
+
+def _estimates(counts, n_target, n_estimation):
+    #the estimate only depends on how many elements are marked, so mark the first ones
+    return [estimate_solutions(range(count), n_target, n_estimation) for count in counts]
+
+
+def relative_errors(index_sets, n_target=4, n_estimation=4, processes=None):
+    """relative_error for many oracles at once.
+
+    The counting estimate only depends on the number of distinct marked elements, so it is
+    computed once per solution count and shared by every index set with that count. The error
+    is relative to the size of each index set, so raises ValueError if one of them is empty.
+
+    Args:
+        - index_sets (list(list(int))): one list of marked elements per oracle
+        - n_target (int): number of target wires
+        - n_estimation (int): number of estimation wires
+        - processes (int): if given, split the distinct solution counts into this many chunks and
+        estimate them in a process pool
+
+    Returns:
+        - (np.ndarray): relative error of each index set, in percent
+    """
+
+    for i, indices in enumerate(index_sets):
+        if len(indices) == 0:
+            raise ValueError(f"index set {i} is empty, so its relative error is undefined")
+
+    sizes = onp.array([len(indices) for indices in index_sets], dtype=float)
+    marked = onp.array([len(set(indices)) for indices in index_sets], dtype=int)
+    counts, inverse = onp.unique(marked, return_inverse=True)
+
+    if processes is None or processes == 1:
+        estimates = _estimates(counts.tolist(), n_target, n_estimation)
+    else:
+        chunks = onp.array_split(counts, processes)
+        with concurrent.futures.ProcessPoolExecutor(processes) as pool:
+            futures = [pool.submit(_estimates, c.tolist(), n_target, n_estimation) for c in chunks if len(c)]
+            estimates = [estimate for future in futures for estimate in future.result()]
+
+    return (onp.array(estimates)[inverse].reshape(-1) - sizes) / sizes * 100
+
+
 if __name__ == '__main__':
     # DO NOT MODIFY anything in this code block
     inputs = sys.stdin.read().split(",")
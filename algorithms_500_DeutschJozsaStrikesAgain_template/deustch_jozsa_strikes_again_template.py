@@ -11,6 +11,7 @@ The general approach to solving this problem is as follows:
     transfer result to qubit 3 by rotating it by Pi/2 about the Y axis if qubit 2 is |1>
     "reset" qubits 0, 1, and 2 by performing the inverse of some of the operations implemented on them (including oracle 1)
     repeat the process for oracles 2, 3, and 4
+    (with k oracles instead of four, qubit 3 is rotated by 2 Pi / k each time)
     
     At this point, there two possibilities:
         1. all four functions are constant: qubit 3 has been rotated by Pi/2 four times & has returned to |0>
@@ -23,11 +24,12 @@ def deutsch_jozsa(fs):
     """Function that determines whether four given functions are all of the same type or not.
 
     Args:
-        - fs (list(function)): A list of 4 quantum functions. Each of them will accept a 'wires' parameter.
+        - fs (list(function)): A list of 4 quantum functions, or any even number k of them. Each of them will accept a 'wires' parameter.
         The first two wires refer to the input and the third to the output of the function.
+        An odd k has no "k/2 and k/2" answer, so circuit_operations raises ValueError for it.
 
     Returns:
-        - (str) : "4 same" or "2 and 2"
+        - (str) : "4 same" or "2 and 2", and in general "k same" or "k/2 and k/2"
     """
 
 
@@ -35,59 +37,88 @@ def deutsch_jozsa(fs):
     # QHACK #
     output=circuit(fs)
     
-    #if state of qubit 3 is close to being |0>, then all four oracles are the same
+    #if state of qubit 3 is close to being |0>, then all the oracles are the same
     if output[0]>0.99:
-        return "4 same"
+        return f"{len(fs)} same"
     
-    #two functions are balanced & two are constant
+    #half of the functions are balanced & half are constant
     else:
-        return "2 and 2"    
+        return f"{len(fs) // 2} and {len(fs) // 2}"    
     
 dev = qml.device("default.qubit", wires=4)
 
+#gates that are their own inverse, and rotations undone by negating their angles
+SELF_INVERSE = {"Hadamard", "PauliX", "PauliY", "PauliZ", "CNOT", "CZ", "SWAP", "Toffoli", "MultiControlledX"}
+ROTATIONS = {"RX", "RY", "RZ", "PhaseShift", "CRX", "CRY", "CRZ", "ControlledPhaseShift"}
+
 @qml.qnode(dev)
 def circuit(fs):
+    """Runs the compiled k-oracle circuit and measures qubit 3.
 
-    #
-    #Prepare qubits 0, 1, and 2 according to the Deutsch-Jozsa algorithm
-    #
-    
-    #perform Hadamards on two input qubits
-    qml.Hadamard(wires=0)
-    qml.Hadamard(wires=1)
-    
-    #prepare output qubit (i.e., qubit 2) in |1> & then perform an H gate
-    qml.PauliX(wires=2)
-    qml.Hadamard(wires=2)
+    Args:
+        - fs (list(function)): the oracles, see deutsch_jozsa
 
-    """
-    The code below performs the following sequence:
-    1. implements Deutsch-Jozsa algorithm with oracle 1 (i.e., f1), 
-    2. stores output in state of qubit 2 (|0> = balanced function, |1> = constant function)
-    3. rotates qubit 3 if qubit 2 is |1>
-    4. returns qubits 0, 1, & 2 to their state prior to implementing f1
-    5. repeats steps 1, 2, 3, and 4 for oracles f2, f3, and f4
+    Returns:
+        - (np.tensor): probabilities of qubit 3
     """
 
-    #implement first oracle
-    implement_oracle_and_next_gates(f1)
-    reverseUnitaries(f1)
-    
-    #implement second oracle
-    implement_oracle_and_next_gates(f2)
-    reverseUnitaries(f2)
+    #the gates are recorded on a separate tape, which must not be queued into this QNode as well
+    with qml.tape.stop_recording():
+        operations = compile_circuit(fs)
 
-    #implement third oracle
-    implement_oracle_and_next_gates(f3)
-    reverseUnitaries(f3)
-    
-    #implement fourth oracle
-    implement_oracle_and_next_gates(f4)
+    for op in operations:
+        qml.apply(op)
 
     #measure state of qubit 3
     return qml.probs(wires=3)
+
+def circuit_operations(fs):
+    """Records the gates of the circuit for any even number of oracles, before any simplification.
+
+    Qubit 3 is rotated by 2 pi / k per constant oracle, which only separates "k same" from
+    "k/2 and k/2" when k is even; raises ValueError when k is zero or odd.
+
+    Args:
+        - fs (list(function)): the oracles, see deutsch_jozsa
+
+    Returns:
+        - (list(qml.Operation)): the gates, in order
+    """
+
+    if len(fs) == 0 or len(fs) % 2:
+        raise ValueError(f"the circuit needs a positive, even number of oracles, got {len(fs)}")
+
+    with qml.tape.QuantumTape() as tape:
+
+        #
+        #Prepare qubits 0, 1, and 2 according to the Deutsch-Jozsa algorithm
+        #
+        
+        #perform Hadamards on two input qubits
+        qml.Hadamard(wires=0)
+        qml.Hadamard(wires=1)
+        
+        #prepare output qubit (i.e., qubit 2) in |1> & then perform an H gate
+        qml.PauliX(wires=2)
+        qml.Hadamard(wires=2)
+
+        """
+        The code below performs the following sequence for every oracle:
+        1. implements Deutsch-Jozsa algorithm with the oracle, 
+        2. stores output in state of qubit 2 (|0> = balanced function, |1> = constant function)
+        3. rotates qubit 3 by 2 pi / k if qubit 2 is |1>, so k constant or k balanced oracles
+        bring it back to |0> and k / 2 of each take it to |1>
+        4. returns qubits 0, 1, & 2 to their state prior to implementing the oracle, except after the last one
+        """
+
+        for i, oracle in enumerate(fs):
+            implement_oracle_and_next_gates(oracle, 2 * np.pi / len(fs))
+            if i < len(fs) - 1:
+                reverseUnitaries(oracle)
+
+    return tape.operations
  
-def implement_oracle_and_next_gates(oracle):
+def implement_oracle_and_next_gates(oracle, angle=np.pi / 2):
     #implement desired oracle, i.e., f1, f2, f3, or f4
     oracle(wires=[0,1,2])
 
@@ -98,7 +129,7 @@ def implement_oracle_and_next_gates(oracle):
     """perform rotation on output qubit to take it to |0>
     This makes sure that it's prepared in the correct state for the MultiControlledX operation
     """
-    qml.RY(3.14159/2,wires=2)
+    qml.RY(np.pi/2,wires=2)
 
     """result of Deutsch-Jozsa algorithm is encoded in first two qubits. Transfer it to the output qubit (qubit 2)
     After this operation, the output qubit is such that:
@@ -106,9 +137,9 @@ def implement_oracle_and_next_gates(oracle):
         |0> --> balanced function"""
     qml.MultiControlledX(control_wires=[0,1], wires=[2], control_values="00")
     
-    """perform controlled Pi/2 rotation on qubit 3
+    """perform controlled rotation on qubit 3
     This rotation is performed only if the oracle that was just implemented has a constant function"""
-    qml.CRY(3.14159/2,wires=[2,3])        
+    qml.CRY(angle,wires=[2,3])        
     return
 
 """reverse MultiControlledX, H gates on qubits 0 & 1, RY on qubit 2, and oracle to "reset" first three qubits 
@@ -118,14 +149,95 @@ def reverseUnitaries(oracle):
     
     qml.Hadamard(wires=0)
     qml.Hadamard(wires=1)
-    qml.RY(-3.14159/2,wires=2)
+    qml.RY(-np.pi/2,wires=2)
 
     qml.adjoint(oracle)(wires=[0,1,2])
 
     return
 
-    # QHACK #
+def _are_inverse(first, second):
+    if first.wires != second.wires:
+        return False
+    if first.name == second.name and first.name in SELF_INVERSE:
+        return first.hyperparameters == second.hyperparameters
+    if first.name == second.name and first.name in ROTATIONS:
+        return np.allclose(np.array(first.parameters) + np.array(second.parameters), 0)
+
+    #anything else is compared through its matrix, as long as it is small
+    if len(first.wires) > 3:
+        return False
+    try:
+        product = second.get_matrix() @ first.get_matrix()
+    except (qml.operation.MatrixUndefinedError, NotImplementedError):
+        return False
+    return np.allclose(product, np.eye(len(product)))
+
+def cancel_inverses(operations):
+    """Removes every pair of gates that undo each other with no other gate between them on their wires.
+
+    Pairs exposed by a cancellation are removed too, e.g. H X X H on one wire disappears entirely.
+
+    Args:
+        - operations (list(qml.Operation)): gates in circuit order
+
+    Returns:
+        - (list(qml.Operation)): the remaining gates, in order
+    """
+
+    kept = []
+    #for every wire, the positions in kept of the gates still acting on it
+    last = {}
+
+    for op in operations:
+        previous = {last[w][-1] if last.get(w) else None for w in op.wires}
+        if len(previous) == 1 and None not in previous:
+            i = previous.pop()
+            if _are_inverse(kept[i], op):
+                kept[i] = None
+                for w in op.wires:
+                    last[w].pop()
+                continue
+
+        for w in op.wires:
+            last.setdefault(w, []).append(len(kept))
+        kept.append(op)
+
+    return [op for op in kept if op is not None]
 
+def circuit_depth(operations):
+    """Number of layers of the circuit when every gate starts as soon as its wires are free."""
+
+    level = {}
+    for op in operations:
+        layer = max((level.get(w, 0) for w in op.wires), default=0) + 1
+        level.update((w, layer) for w in op.wires)
+    return max(level.values(), default=0)
+
+def compile_circuit(fs):
+    """The gates of the k-oracle circuit after cancel_inverses."""
+
+    return cancel_inverses(circuit_operations(fs))
+
+def compile_report(fs):
+    """Gate count and depth of the k-oracle circuit before and after compilation.
+
+    Args:
+        - fs (list(function)): the oracles, see deutsch_jozsa
+
+    Returns:
+        - (dict): "gates_before", "depth_before", "gates_after" and "depth_after"
+    """
+
+    before = circuit_operations(fs)
+    after = cancel_inverses(before)
+    return {
+        "gates_before": len(before),
+        "depth_before": circuit_depth(before),
+        "gates_after": len(after),
+        "depth_after": circuit_depth(after),
+    }
+
+    # QHACK #
 
 if __name__ == "__main__":
     # DO NOT MODIFY anything in this co de block
@@ -1,7 +1,11 @@
+import functools
 import sys
+import numpy as onp
 import pennylane as qml
 from pennylane import numpy as np
 
+from qhack import cache, density
+
 
 def second_renyi_entropy(rho):
     """Computes the second Renyi entropy of a given density matrix."""
@@ -10,6 +14,194 @@ def second_renyi_entropy(rho):
     return -np.real(np.log(np.sum(rho_diag_2)))
 
 
+def purity(rho):
+    """Purity Tr(rho^2) of density matrices, in any basis.
+
+    Args:
+        - rho (np.ndarray): a density matrix, or an array of them along the leading axes
+
+    Returns:
+        - (np.ndarray): Tr(rho^2) for every density matrix
+    """
+
+    rho = onp.asarray(rho)
+    #rho is Hermitian, so Tr(rho rho) is the sum of |rho_ij|^2
+    return onp.sum(onp.abs(rho) ** 2, axis=(-2, -1))
+
+
+def renyi_entropy(rho):
+    """Second Renyi entropy -log Tr(rho^2) of density matrices, vectorized like ``purity``."""
+
+    return -onp.log(purity(rho))
+
+
+#Circuit for entangled state without tardigrade
+
+def circuitOne():
+    qml.Hadamard(wires=0)
+    qml.CNOT(wires=[0,1])
+    qml.PauliX(wires=1)    
+
+    return qml.density_matrix([1])    
+
+
+#circuit for entangled state with tardigrade
+
+def tardigrade_gates(theta, gates=qml):
+    """The gates of circuitTwo, which prepare psi_ABT on wires 0, 1 and 2.
+
+    Args:
+        - theta (float or np.ndarray): the angle of the CRY gate
+        - gates: where the gates come from, ``qml`` to queue them or a ``_BatchedGates``
+        to apply them to a batch of states
+    """
+
+    gates.Hadamard(wires=0)
+    gates.CRY(theta,wires=[0,1])
+    gates.CNOT(wires=[1,2])
+    gates.CNOT(wires=[0,1])
+    gates.PauliX(wires=0)
+
+
+def circuitTwo(theta):
+    tardigrade_gates(theta)
+
+    return qml.density_matrix([1])     
+
+
+class _BatchedGates:
+    """Stands in for ``qml`` in tardigrade_gates, applying each gate to a batch of state tensors.
+
+    Args:
+        - n_states (int): number of states, all starting in |0...0>
+        - n_wires (int): number of wires; axis k + 1 of ``state`` is wire k
+    """
+
+    HADAMARD = onp.array([[1, 1], [1, -1]]) / onp.sqrt(2)
+    PAULI_X = onp.array([[0, 1], [1, 0]])
+
+    def __init__(self, n_states, n_wires):
+        self.state = onp.zeros((n_states,) + (2,) * n_wires)
+        self.state[(slice(None),) + (0,) * n_wires] = 1
+
+    def _apply(self, matrix, wire, control=None):
+        #matrix is one 2x2 matrix, or one per state
+        matrix = onp.broadcast_to(matrix, (len(self.state), 2, 2))
+        index = [slice(None)] * self.state.ndim
+        if control is not None:
+            #only the part of the states where the control is |1> changes; this is a view
+            index[control + 1] = 1
+        block = self.state[tuple(index)]
+        axis = wire + 1 - (control is not None and control < wire)
+        updated = onp.einsum("tij,t...j->t...i", matrix, onp.moveaxis(block, axis, -1))
+        block[...] = onp.moveaxis(updated, -1, axis)
+
+    def Hadamard(self, wires):
+        self._apply(self.HADAMARD, wires)
+
+    def PauliX(self, wires):
+        self._apply(self.PAULI_X, wires)
+
+    def CNOT(self, wires):
+        self._apply(self.PAULI_X, wires[1], control=wires[0])
+
+    def CRY(self, theta, wires):
+        c, s = onp.cos(onp.asarray(theta) / 2), onp.sin(onp.asarray(theta) / 2)
+        self._apply(onp.moveaxis(onp.array([[c, -s], [s, c]]), -1, 0), wires[1], control=wires[0])
+
+
+def circuit_two_states(thetas):
+    """State vectors of circuitTwo for many angles at once, gate by gate on a batch of state tensors.
+
+    Args:
+        - thetas (np.ndarray): angles of the CRY gate
+
+    Returns:
+        - (np.ndarray): states of shape (len(thetas), 2, 2, 2), axis k + 1 being wire k
+    """
+
+    thetas = onp.atleast_1d(onp.asarray(thetas, dtype=float))
+    batch = _BatchedGates(len(thetas), 3)
+    tardigrade_gates(thetas, batch)
+    return batch.state
+
+
+def environment_circuit(theta, n_environment):
+    """circuitTwo, after which the tardigrade (wire 2) is copied by CNOTs into n_environment more wires."""
+
+    tardigrade_gates(theta)
+    for w in range(3, 3 + n_environment):
+        qml.CNOT(wires=[2, w])
+
+    return qml.state()
+
+
+def environment_entropy(theta, n_environment, keep=(1,), max_entries=2**20):
+    """Second Renyi entropy of some wires of the tardigrade model with an environment.
+
+    The reduced density matrix is computed by ``qhack.density`` from the state vector,
+    without building the density matrix of the whole system. As the CNOTs only act on
+    wires 2 and up, the entropy of qubit B does not depend on n_environment.
+
+    Args:
+        - theta (float): the angle that defines the state psi_ABT
+        - n_environment (int): number of environment wires after the tardigrade
+        - keep (tuple(int)): wires whose entropy is computed
+        - max_entries (int): largest number of amplitudes copied at once by the partial trace
+
+    Returns:
+        - (float): the second Renyi entropy, from the true purity
+    """
+
+    state = cache.qnode(environment_circuit, "default.qubit", wires=3 + n_environment)(theta, n_environment)
+    rho = density.reduced_density_matrix(onp.asarray(state), list(keep), max_entries)
+    return float(renyi_entropy(rho))
+
+
+@functools.lru_cache(maxsize=None)
+def _without_tardigrade():
+    #circuitOne does not depend on theta, so it is run once per process
+    rho = cache.qnode(circuitOne, "default.qubit", wires=3)()
+    rho.flags.writeable = False
+    return rho
+
+
+def entanglement_sweep(thetas, method="tensor"):
+    """Second Renyi entropies of qubit B, from the true purity Tr(rho^2), for many angles.
+
+    With method "tensor" circuitTwo is simulated for all angles at once by
+    ``circuit_two_states``; with method "device" one tape per angle is built and all of
+    them are run in a single batched execution on "default.qubit". circuitOne does not
+    depend on theta and is only run on the first call.
+
+    Args:
+        - thetas (np.ndarray): angles that define the state psi_ABT
+        - method (str): "tensor" or "device"
+
+    Returns:
+        - (float): the entropy of qubit B with no tardigrade
+        - (np.ndarray): the entropy of qubit B with the tardigrade, for every angle
+    """
+
+    thetas = onp.atleast_1d(onp.asarray(thetas, dtype=float))
+
+    if method == "device":
+        tapes = []
+        for theta in thetas:
+            with qml.tape.QuantumTape() as tape:
+                circuitTwo(theta)
+            tapes.append(tape)
+        rho = onp.array(qml.execute(tapes, cache.device("default.qubit", wires=3), gradient_fn=None))
+    elif method == "tensor":
+        state = circuit_two_states(thetas)
+        #reduced density matrix of wire 1: contract wires 0 and 2 of the state with its conjugate
+        rho = onp.einsum("tajb,takb->tjk", state, state.conj())
+    else:
+        raise ValueError(f"unknown method {method!r}, expected 'tensor' or 'device'")
+
+    return float(renyi_entropy(_without_tardigrade())), renyi_entropy(rho.reshape(len(thetas), 2, 2))
+
+
 def compute_entanglement(theta):
     """Computes the second Renyi entropy of circuits with and without a tardigrade present.
 
@@ -23,34 +215,13 @@ def compute_entanglement(theta):
         was initially present
     """
 
-    dev = qml.device("default.qubit", wires=3)
-
     # QHACK #
 
-    #Circuit for entangled state without tardigrade
-        
-    @qml.qnode(dev)
-    def circuitOne():
-        qml.Hadamard(wires=0)
-        qml.CNOT(wires=[0,1])
-        qml.PauliX(wires=1)    
-
-        return qml.density_matrix([1])    
-
-
-    #circuit for entangled state with tardigrade
-    
-    @qml.qnode(dev)
-    def circuitTwo():
-        qml.Hadamard(wires=0)
-        qml.CRY(theta,wires=[0,1])
-        qml.CNOT(wires=[1,2])
-        qml.CNOT(wires=[0,1])
-        qml.PauliX(wires=0)
-
-        return qml.density_matrix([1])     
+    #circuitOne does not depend on theta and is run on the first call only; the QNode of
+    #circuitTwo is cached
+    with_tardigrade = cache.qnode(circuitTwo, "default.qubit", wires=3)
       
-    return second_renyi_entropy(circuitOne()),second_renyi_entropy(circuitTwo())
+    return second_renyi_entropy(_without_tardigrade()),second_renyi_entropy(with_tardigrade(theta))
     
     
     # QHACK #
@@ -1,6 +1,8 @@
 #! /usr/bin/python3
 
 import sys
+import concurrent.futures
+import numpy as onp
 import pennylane as qml
 from pennylane import numpy as np
 
@@ -101,25 +103,127 @@ def winning_prob(params, alpha, beta):
     
     return pr_win
     # QHACK #
-    
 
-def optimize(alpha, beta):
+
+def all_settings_probs(params, alpha, beta):
+    """Computes the output probabilities of chsh_circuit for all four (x, y) settings at once.
+
+    The state after prepare_entangled is cos(theta)|00> + sin(theta)|11>, and Alice and Bob
+    only apply real Y rotations, so every amplitude has a closed form. This evaluates the four
+    settings as one vectorized expression that autograd can differentiate, instead of
+    four separate circuit executions.
+
+    Args:
+        - params (list(float)): List containing [theta_A0,theta_A1,theta_B0,theta_B1]
+        - alpha (float): real coefficient of |00>
+        - beta (float): real coefficient of |11>
+
+    Returns:
+        - (np.tensor): 4x4 array; row 2*x+y holds the probabilities of |00>, |01>, |10> and |11>
+    """
+
+    theta = np.arctan(beta/alpha)
+    c, s = np.cos(theta), np.sin(theta)
+
+    #rows are the settings (x,y) = (0,0), (0,1), (1,0), (1,1)
+    theta_A = np.stack([params[0], params[0], params[1], params[1]])
+    theta_B = np.stack([params[2], params[3], params[2], params[3]])
+
+    cos_A, sin_A = np.cos(theta_A), np.sin(theta_A)
+    cos_B, sin_B = np.cos(theta_B), np.sin(theta_B)
+
+    #amplitudes of (RY(2 theta_A) x RY(2 theta_B)) (c|00> + s|11>)
+    amp_00 = c*cos_A*cos_B + s*sin_A*sin_B
+    amp_01 = c*cos_A*sin_B - s*sin_A*cos_B
+    amp_10 = c*sin_A*cos_B - s*cos_A*sin_B
+    amp_11 = c*sin_A*sin_B + s*cos_A*cos_B
+
+    return np.stack([amp_00, amp_01, amp_10, amp_11], axis=1)**2
+
+
+#sign with which the correlator of each setting (x, y) enters the winning probability
+CHSH_SIGNS = np.array([[1.0, 1.0], [1.0, -1.0]], requires_grad=False)
+
+
+def winning_prob_batched(params, alpha, beta):
+    """Same as winning_prob, but evaluates all four settings in a single vectorized call.
+
+    With E(x,y) = P(00) + P(11) - P(01) - P(10), the winning probability is
+    1/2 + (E(0,0) + E(0,1) + E(1,0) - E(1,1))/8, and from all_settings_probs
+    E(x,y) = cos(2 theta_Ax) cos(2 theta_By) + sin(2 theta) sin(2 theta_Ax) sin(2 theta_By).
+
+    Args:
+        - params (list(float)): List containing [theta_A0,theta_A1,theta_B0,theta_B1]
+        - alpha (float): real coefficient of |00>
+        - beta (float): real coefficient of |11>
+
+    Returns:
+        - (float): Probability of winning the game
+    """
+
+    k = np.sin(2.0*np.arctan(beta/alpha))
+    theta_A = 2.0*np.stack([params[0], params[1]])
+    theta_B = 2.0*np.stack([params[2], params[3]])
+
+    correlators = np.outer(np.cos(theta_A), np.cos(theta_B)) + k*np.outer(np.sin(theta_A), np.sin(theta_B))
+
+    return 0.5 + np.sum(CHSH_SIGNS*correlators)/8.0
+
+
+def winning_prob_grad(params, alpha, beta):
+    """Analytic gradient of winning_prob_batched with respect to params.
+
+    Evaluated with vanilla NumPy, since it is not differentiated any further.
+
+    Args:
+        - params (list(float)): List containing [theta_A0,theta_A1,theta_B0,theta_B1]
+        - alpha (float): real coefficient of |00>
+        - beta (float): real coefficient of |11>
+
+    Returns:
+        - (np.ndarray): d(winning probability)/d(params), in the same order as params
+        - (float): the winning probability itself
+    """
+
+    k = onp.sin(2.0*onp.arctan(beta/alpha))
+    signs = qml.math.to_numpy(CHSH_SIGNS)
+    angles = 2.0*qml.math.to_numpy(params)
+    cos_A, sin_A = onp.cos(angles[:2]), onp.sin(angles[:2])
+    cos_B, sin_B = onp.cos(angles[2:]), onp.sin(angles[2:])
+
+    win = 0.5 + onp.sum(signs*(onp.outer(cos_A, cos_B) + k*onp.outer(sin_A, sin_B)))/8.0
+    grad_A = (-sin_A*(signs @ cos_B) + k*cos_A*(signs @ sin_B))/4.0
+    grad_B = (-sin_B*(signs.T @ cos_A) + k*cos_B*(signs.T @ sin_A))/4.0
+
+    return onp.concatenate([grad_A, grad_B]), win
+
+
+def optimize(alpha, beta, batched=True):
     """Define a function that optimizes theta_A0, theta_A1, theta_B0, theta_B1 to maximize the probability of winning the game
 
     Args:
         - alpha (float): real coefficient of |00>
         - beta (float): real coefficient of |11>
+        - batched (bool): use the closed-form winning_prob_batched and its analytic gradient instead of
+        four circuit executions per cost evaluation
 
     Returns:
         - (float): Probability of winning
     """
 
+    win = winning_prob_batched if batched else winning_prob
+
     def cost(params):
         """Define a cost function that only depends on params, given alpha and beta fixed"""
 
     # QHACK #
         #Define the cost as the square loss between 1 (always winning) and the actual probability of winning.
-        return (1 - winning_prob(params, alpha, beta))**2
+        return (1 - win(params, alpha, beta))**2
+
+    def cost_grad(params):
+        """Gradient of cost, from the closed-form winning probability"""
+        grad, pr_win = winning_prob_grad(params, alpha, beta)
+        return -2.0*(1 - pr_win)*grad
 
 
     
@@ -141,11 +245,117 @@ def optimize(alpha, beta):
         # update the circuit parameters 
         # QHACK #
         
-        params = opt.step(cost,params) 
+        params = opt.step(cost, params, grad_fn=cost_grad if batched else None)
         
         # QHACK #
 
-    return winning_prob(params, alpha, beta)
+    return win(params, alpha, beta)
+
+
+def optimal_params(alpha, beta):
+    """Closed-form optimum of winning_prob_batched, without any gradient steps.
+
+    With k = sin(2 theta) the correlators are E(x,y) = cos(a_x) cos(b_y) + k sin(a_x) sin(b_y),
+    where a_x = 2 theta_Ax and b_y = 2 theta_By. Alice measuring along a_0 = 0 and a_1 = pi/2 and
+    Bob along b_y = +-arctan(k) reaches the maximum 1/2 + sqrt(1 + k^2)/4.
+
+    Args:
+        - alpha (float): real coefficient of |00>
+        - beta (float): real coefficient of |11>
+
+    Returns:
+        - (np.ndarray): optimal [theta_A0,theta_A1,theta_B0,theta_B1]
+        - (float): the optimal probability of winning
+    """
+
+    k = onp.sin(2.0*onp.arctan(beta/alpha))
+    phi = onp.arctan(k)
+
+    return onp.array([0.0, onp.pi/4, phi/2, -phi/2]), 0.5 + onp.sqrt(1 + k**2)/4
+
+
+def _descend(alpha, beta, params, max_steps, tol):
+    """Gradient descent on (1 - winning probability)^2 with the analytic gradient, stopping once
+    the cost changes by less than tol. Same update rule as qml.GradientDescentOptimizer(stepsize=0.4).
+    """
+
+    stepsize = 0.4
+    cost = None
+    steps = 0
+
+    for _ in range(max_steps):
+        steps += 1
+        grad, pr_win = winning_prob_grad(params, alpha, beta)
+        previous, cost = cost, (1 - pr_win)**2
+        if previous is not None and abs(previous - cost) < tol:
+            break
+        params = params + stepsize*2.0*(1 - pr_win)*grad
+
+    return params, steps
+
+
+def _sweep_chunk(alphas, betas, init_params, max_steps, tol, warm_start):
+    params = onp.array(init_params, dtype=float)
+    results = []
+
+    for alpha, beta in zip(alphas, betas):
+        start = params if warm_start else onp.array(init_params, dtype=float)
+        params, steps = _descend(alpha, beta, start, max_steps, tol)
+        results.append((params, winning_prob_grad(params, alpha, beta)[1], steps))
+
+    return results
+
+
+def optimize_sweep(alphas, betas, analytic=False, warm_start=True, tol=1e-12, max_steps=500, processes=None):
+    """Optimizes the measurement angles for many (alpha, beta) pairs.
+
+    Each optimization starts from the solution of the previous pair, so a smooth scan over the
+    entanglement parameters needs only a few steps per pair, and stops as soon as the cost
+    changes by less than tol.
+
+    Args:
+        - alphas (np.ndarray): real coefficients of |00>
+        - betas (np.ndarray): real coefficients of |11>, same length as alphas
+        - analytic (bool): skip the optimization and return optimal_params for every pair
+        - warm_start (bool): start each optimization from the previous pair's solution rather than from [0.5,0.5,0.0,1.0]
+        - tol (float): stop once the cost changes by less than this between two steps
+        - max_steps (int): upper bound on the number of steps per pair
+        - processes (int): if given, split the sweep into this many contiguous chunks and optimize them in a
+        process pool. Warm starts then only carry over within a chunk
+
+    Returns:
+        - (np.ndarray): probability of winning for each pair
+        - (np.ndarray): optimized [theta_A0,theta_A1,theta_B0,theta_B1] for each pair, shape (len(alphas), 4)
+        - (np.ndarray): number of gradient steps taken for each pair
+    """
+
+    alphas = onp.asarray(alphas, dtype=float)
+    betas = onp.asarray(betas, dtype=float)
+
+    if analytic:
+        optima = [optimal_params(alpha, beta) for alpha, beta in zip(alphas, betas)]
+        return (
+            onp.array([pr_win for _, pr_win in optima]),
+            onp.array([params for params, _ in optima]),
+            onp.zeros(len(alphas), dtype=int),
+        )
+
+    init_params = [0.5, 0.5, 0.0, 1.0]
+    args = (init_params, max_steps, tol, warm_start)
+
+    if processes is None or processes == 1:
+        results = _sweep_chunk(alphas, betas, *args)
+    else:
+        chunks = onp.array_split(onp.arange(len(alphas)), processes)
+        with concurrent.futures.ProcessPoolExecutor(processes) as pool:
+            futures = [pool.submit(_sweep_chunk, alphas[c], betas[c], *args) for c in chunks if len(c)]
+            results = [result for future in futures for result in future.result()]
+
+    return (
+        onp.array([pr_win for _, pr_win, _ in results]),
+        onp.array([params for params, _, _ in results]),
+        onp.array([steps for _, _, steps in results]),
+    )
 
 
 if __name__ == '__main__':
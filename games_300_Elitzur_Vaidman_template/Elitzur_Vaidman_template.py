@@ -1,6 +1,7 @@
 #! /usr/bin/python3
 
 import sys
+from statistics import NormalDist
 import pennylane as qml
 from pennylane import numpy as np
 
@@ -54,12 +55,150 @@ def bomb_tester(angle):
     return qml.sample(qml.PauliZ(0))
 
 
-def simulate(angle, n):
-    """Concatenate n bomb circuits and a final measurement, and return the results of 10000 one-shot measurements
+def _beep_fraction(num_D_beeps, num_unexploded_bombs):
+    if num_unexploded_bombs == 0:
+        raise ValueError("no photon got through all the bombs; increase shots or the angle")
+    return float(num_D_beeps/num_unexploded_bombs)
+
+
+def simulate_batched(angle, n, shots=10000):
+    """Same experiment as simulate, with all the one-shot measurements drawn in two device calls.
+
+    The n is_bomb measurements of every photon are sampled at once, and bomb_tester is then
+    sampled once for each photon that got through all n bombs. Photons that triggered a bomb
+    still have samples for the later stages, but those are never looked at, so the statistics
+    are the same as in the one-shot loop. Raises ValueError if no photon gets through.
+
+    Args:
+        - angle (float): transmissivity of all the beam splitters, taken to be identical.
+        - n (int): number of bomb circuits concatenated
+        - shots (int): number of photons sent through the interferometer
+
+    Returns:
+        - (float): number of bombs successfully tested / number of bombs that didn't explode.
+    """
+
+    #row j holds the n bomb measurements of photon j; +1 means the photon hit that bomb
+    stages = np.reshape(is_bomb(angle, shots=shots*n), (shots, n))
+    num_unexploded_bombs = int(np.sum(np.all(stages == -1, axis=1)))
+
+    num_D_beeps = 0
+    if num_unexploded_bombs > 0:
+        final_detection = np.reshape(bomb_tester(angle, shots=num_unexploded_bombs), -1)
+        num_D_beeps = int(np.sum(final_detection == -1))
+
+    return _beep_fraction(num_D_beeps, num_unexploded_bombs)
+
+
+def simulate_born(angle, n, shots=10000, seed=None):
+    """Same experiment as simulate, sampled from the exact Born probabilities instead of a device.
+
+    Each bomb lets the photon through with probability sin^2(angle), and D beeps with the same
+    probability, so the number of unexploded bombs and of D beeps are binomially distributed.
+    Raises ValueError if no photon gets through.
 
     Args:
         - angle (float): transmissivity of all the beam splitters, taken to be identical.
         - n (int): number of bomb circuits concatenated
+        - shots (int): number of photons sent through the interferometer
+        - seed (int): seed for the NumPy random number generator
+
+    Returns:
+        - (float): number of bombs successfully tested / number of bombs that didn't explode.
+    """
+
+    rng = np.random.default_rng(seed)
+    p_pass = np.sin(angle)**2
+
+    num_unexploded_bombs = rng.binomial(shots, p_pass**n)
+    num_D_beeps = rng.binomial(num_unexploded_bombs, p_pass)
+
+    return _beep_fraction(num_D_beeps, num_unexploded_bombs)
+
+
+def exact_probabilities(angle, n):
+    """Exact probabilities behind simulate, without sampling.
+
+    A photon gets past one bomb with probability sin^2(angle) (is_bomb measures -1), so it
+    reaches the final beam splitter with probability sin^2(angle)^n, and bomb_tester then
+    makes D beep with probability sin^2(angle).
+
+    Args:
+        - angle (float): transmissivity of all the beam splitters, taken to be identical.
+        - n (int): number of bomb circuits concatenated
+
+    Returns:
+        - (float): probability that D beeps given the bomb did not explode, i.e. the value simulate estimates
+        - (float): probability that the bomb does not explode
+    """
+
+    p_pass = np.sin(angle)**2
+    return float(p_pass), float(p_pass**n)
+
+
+def _normal_quantile(confidence):
+    return NormalDist().inv_cdf(0.5 + confidence/2)
+
+
+def confidence_interval(angle, n, shots=10000, confidence=0.95):
+    """Confidence interval of the value returned by the sampled methods of simulate.
+
+    Out of `shots` photons about shots * P(unexploded) reach the final detectors, and the
+    estimate is the fraction of those that make D beep. Uses the normal approximation to
+    that binomial fraction, clipped to [0, 1]. If no photon can get through, e.g. for angle 0
+    or when sin^2(angle)^n underflows, the samples say nothing and the interval is (0, 1).
+
+    Args:
+        - angle (float): transmissivity of all the beam splitters, taken to be identical.
+        - n (int): number of bomb circuits concatenated
+        - shots (int): number of photons sent through the interferometer
+        - confidence (float): confidence level, e.g. 0.95
+
+    Returns:
+        - (float, float): lower and upper end of the interval
+    """
+
+    p_beep, p_unexploded = exact_probabilities(angle, n)
+    if p_unexploded == 0:
+        return 0.0, 1.0
+    half_width = _normal_quantile(confidence)*np.sqrt(p_beep*(1 - p_beep)/(shots*p_unexploded))
+
+    return max(0.0, p_beep - half_width), min(1.0, p_beep + half_width)
+
+
+def shots_for_accuracy(angle, n, half_width, confidence=0.95):
+    """Smallest shot count whose confidence_interval is no wider than +-half_width.
+
+    Raises ValueError if no photon can get through, since no shot count is then enough.
+
+    Args:
+        - angle (float): transmissivity of all the beam splitters, taken to be identical.
+        - n (int): number of bomb circuits concatenated
+        - half_width (float): accepted deviation from the exact value
+        - confidence (float): confidence level, e.g. 0.95
+
+    Returns:
+        - (int): number of photons to send through the interferometer
+    """
+
+    p_beep, p_unexploded = exact_probabilities(angle, n)
+    if p_unexploded == 0:
+        raise ValueError(f"no photon gets through {n} bombs at angle {angle}")
+    variance = p_beep*(1 - p_beep)/p_unexploded
+
+    return max(1, int(np.ceil(variance*(_normal_quantile(confidence)/half_width)**2)))
+
+
+def simulate(angle, n, method="batched", shots=10000, seed=None):
+    """Concatenate n bomb circuits and a final measurement, and return the results of `shots` (10000 by default) one-shot measurements
+
+    Args:
+        - angle (float): transmissivity of all the beam splitters, taken to be identical.
+        - n (int): number of bomb circuits concatenated
+        - method (str): "loop" executes every one-shot circuit separately, "batched" uses simulate_batched,
+        "born" uses simulate_born and "exact" returns the exact value from exact_probabilities
+        - shots (int): number of photons sent through the interferometer
+        - seed (int): seed for the "born" method
 
     Returns:
         - (float): number of bombs successfully tested / number of bombs that didn't explode.
@@ -67,10 +206,22 @@ def simulate(angle, n):
 
     # QHACK #
 
+    if method == "batched":
+        return simulate_batched(angle, n, shots)
+
+    if method == "born":
+        return simulate_born(angle, n, shots, seed)
+
+    if method == "exact":
+        return exact_probabilities(angle, n)[0]
+
+    if method != "loop":
+        raise ValueError(f"unknown method {method!r}, expected 'loop', 'batched', 'born' or 'exact'")
+
     num_D_beeps = 0
     num_unexploded_bombs = 0
 
-    for j in range(10000): 
+    for j in range(shots): 
    
         for i in range(n):
             
@@ -4,78 +4,143 @@ import sys
 from pennylane import numpy as np
 import pennylane as qml
 
+from qhack import cache, oracles
 
-dev = qml.device("default.qubit", wires=[0, 1, "sol"], shots=1)
 
+WIRES = [0, 1, "sol"]
 
-def find_the_car(oracle):
+
+def circuit1(oracle):
+    # QHACK #
+    
+    """The door with the car behind it is found as follows:
+        1. Effectively, run Deutsch's algorithm with the 2nd qubit as the input & the sol qubit as the output. Do this by preparing the state:
+            |0> (|0> + |1>) (|0> - |1>)
+        
+        Case A: If the second qubit is 1 by the end of circuit, then 00 and 01 have different outputs. So, one of them must be the solution. 
+        (As only the solution produces the output of 1.) 
+        
+        Case B: If the second qubit is 0 by the end of circuit, then 00 and 01 produce the same output. 
+        So, neither of them is the solution.
+        
+       2. Essentially, run Deutsch's algorithm again but with the 1st qubit as the input & the initial state (|0> + |1>) |0> (|0> - |1>).
+        CASE A: If the first qubit is 1 at the end of the circuit, then then 00 and 10 have different outputs. So, one of them must be the solution. 
+        CASE B: If the first qubit is 0 by the end of circuit, then 00 and 10 produce the same output. So, neither of them is the solution.
+        
+        3. Use logic to process the outputs of the circuits and determine where the car is.
+    """
+    
+    #prepare the input state of |00> + |01>
+    qml.Hadamard(wires=1)
+
+    #prepare the sol qubit (3rd qubit) in the state |0> - |1>
+    qml.PauliX(wires="sol")
+    qml.Hadamard(wires="sol")
+    
+    oracle()
+
+    #apply H gate to 2nd qubit
+    qml.Hadamard(wires=1)
+
+    # QHACK #
+    return qml.sample()
+
+
+def circuit2(oracle):
+    # QHACK #
+   
+    #prepare the input state of |00> + |10>
+    qml.Hadamard(wires=0)
+
+    #prepare the sol qubit (3rd qubit) in the state |0> - |1>
+    qml.PauliX(wires="sol")
+    qml.Hadamard(wires="sol")
+        
+    oracle() 
+    
+    #apply H gate to 1st qubit
+    qml.Hadamard(wires=0)
+    
+    # QHACK #
+    return qml.sample()
+
+
+def run_circuits(oracle_list, device="default.qubit", shots=1):
+    """Runs circuit1 and circuit2 for every oracle in a single batched device execution.
+
+    Args:
+        - oracle_list (list(function)): oracles, as for ``find_the_car``
+        - device (str): device to run the circuits on
+        - shots (int): number of shots of each circuit
+
+    Returns:
+        - (np.ndarray): samples of circuit1, of shape (oracles, shots, 3)
+        - (np.ndarray): samples of circuit2, of the same shape
+    """
+
+    tapes = []
+    for oracle in oracle_list:
+        for circuit in (circuit1, circuit2):
+            with qml.tape.stop_recording(), qml.tape.QuantumTape() as tape:
+                circuit(oracle)
+            tapes.append(tape)
+
+    results = qml.execute(tapes, cache.device(device, WIRES, shots), gradient_fn=None)
+    samples = np.reshape(np.stack(results), (len(oracle_list), 2, shots, len(WIRES)))
+    return samples[:, 0], samples[:, 1]
+
+
+def find_the_cars(oracle_list, device="default.qubit"):
+    """Finds the car for many oracles, running every circuit in one batched device execution.
+
+    Args:
+        - oracle_list (list(function)): oracles, as for ``find_the_car``
+        - device (str): device to run the circuits on
+
+    Returns:
+        - (list(int)): the door of every oracle
+    """
+
+    doors = [None] * len(oracle_list)
+    #on the state vector simulator, oracles of classical reversible gates are answered from their truth table
+    if device == "default.qubit":
+        for k, oracle in enumerate(oracle_list):
+            f = oracles.boolean_function(oracles.record(oracle), [0, 1], "sol")
+            if f is not None and f.sum() == 1:
+                doors[k] = int(np.argmax(f))
+
+    pending = [k for k, door in enumerate(doors) if door is None]
+    if pending:
+        sol1, sol2 = run_circuits([oracle_list[k] for k in pending], device)
+        #the decoding table of find_the_car: (1, 0) -> 1, (1, 1) -> 0, (0, 0) -> 3, (0, 1) -> 2
+        for k, door in zip(pending, 3 - 2 * sol1[:, 0, 1] - sol2[:, 0, 0]):
+            doors[k] = int(door)
+
+    return doors
+
+
+def find_the_car(oracle, device="default.qubit"):
     """Function which, given an oracle, returns which door that the car is behind.
 
     Args:
         - oracle (function): function that will act as an oracle. The first two qubits (0,1)
         will refer to the door and the third ("sol") to the answer.
+        - device (str): device to simulate the circuits on, e.g. "qhack.stabilizer"
 
     Returns:
         - (int): 0, 1, 2, or 3. The door that the car is behind.
     """
 
-    @qml.qnode(dev)
-    def circuit1():
-        # QHACK #
-        
-        """The door with the car behind it is found as follows:
-            1. Effectively, run Deutsch's algorithm with the 2nd qubit as the input & the sol qubit as the output. Do this by preparing the state:
-                |0> (|0> + |1>) (|0> - |1>)
-            
-            Case A: If the second qubit is 1 by the end of circuit, then 00 and 01 have different outputs. So, one of them must be the solution. 
-            (As only the solution produces the output of 1.) 
-            
-            Case B: If the second qubit is 0 by the end of circuit, then 00 and 01 produce the same output. 
-            So, neither of them is the solution.
-            
-           2. Essentially, run Deutsch's algorithm again but with the 1st qubit as the input & the initial state (|0> + |1>) |0> (|0> - |1>).
-            CASE A: If the first qubit is 1 at the end of the circuit, then then 00 and 10 have different outputs. So, one of them must be the solution. 
-            CASE B: If the first qubit is 0 by the end of circuit, then 00 and 10 produce the same output. So, neither of them is the solution.
-            
-            3. Use logic to process the outputs of the circuits and determine where the car is.
-        """
-        
-        #prepare the input state of |00> + |01>
-        qml.Hadamard(wires=1)
+    #on the state vector simulator, an oracle made of classical reversible gates marks the door
+    #directly in its truth table
+    if device == "default.qubit":
+        f = oracles.boolean_function(oracles.record(oracle), [0, 1], "sol")
+        if f is not None and f.sum() == 1:
+            return int(np.argmax(f))
 
-        #prepare the sol qubit (3rd qubit) in the state |0> - |1>
-        qml.PauliX(wires="sol")
-        qml.Hadamard(wires="sol")
-        
-        oracle()
-
-        #apply H gate to 2nd qubit
-        qml.Hadamard(wires=1)
-
-        # QHACK #
-        return qml.sample()
-
-    @qml.qnode(dev)
-    def circuit2():
-        # QHACK #
-       
-        #prepare the input state of |00> + |10>
-        qml.Hadamard(wires=0)
-
-        #prepare the sol qubit (3rd qubit) in the state |0> - |1>
-        qml.PauliX(wires="sol")
-        qml.Hadamard(wires="sol")
-            
-        oracle() 
-        
-        #apply H gate to 1st qubit
-        qml.Hadamard(wires=0)
-        
-        # QHACK #
-        return qml.sample()
-
-    sol1 = circuit1()
-    sol2 = circuit2()
+    #both circuits go to the device in one batched execution
+    sol1, sol2 = run_circuits([oracle], device)
+    sol1, sol2 = sol1[0, 0], sol2[0, 0]
 
     # QHACK #    
     
@@ -95,6 +160,25 @@ def find_the_car(oracle):
     # QHACK #
 
 
+def find_the_car_vote(oracle, shots, device="default.qubit"):
+    """Finds the car from many shots of both circuits, for noisy devices.
+
+    Args:
+        - oracle (function): as for ``find_the_car``
+        - shots (int): number of shots of each circuit; shot i of both circuits votes for a door
+        - device (str): device to run the circuits on
+
+    Returns:
+        - (int): the door most shots point to
+        - (float): fraction of shots that agree with it
+    """
+
+    sol1, sol2 = run_circuits([oracle], device, shots)
+    #the decoding table of find_the_car: (1, 0) -> 1, (1, 1) -> 0, (0, 0) -> 3, (0, 1) -> 2
+    door, confidence = oracles.majority(3 - 2 * sol1[0, :, 1] - sol2[0, :, 0])
+    return int(door), float(confidence)
+
+
 if __name__ == "__main__":
     # DO NOT MODIFY anything in this code block
     inputs = sys.stdin.read().split(",")
@@ -4,89 +4,166 @@ import sys
 from pennylane import numpy as np
 import pennylane as qml
 
+from qhack import cache, oracles
 
-def switch(oracle):
+
+#largest switchboard answered from the truth table of a classical oracle, which has 2^n_switches rows
+TRUTH_TABLE_MAX_SWITCHES = 12
+
+
+def wires(n_switches):
+    """Wires of a switchboard: one per switch, then "light"."""
+
+    return list(range(n_switches)) + ["light"]
+
+
+def circuit(oracle, n_switches=3):
+
+    # QHACK #
+    """We start solving this problem by, essentially, performing the Deutsch-Joza algorithm with the first switch as the input & the light as the output.
+    We then repeat this process with the second and third switches (and the light).
+    
+    If a switch isn't working, then it won't change the light's state. This is equivalent to the following constant function:
+        f(0) = 0
+        f(1) = 0
+    
+    If a switch is working, then it'll flip the light qubit when the switch's state is |1>. This is equivalent to the following balanced function:
+         f(0) = 0
+         f(1) = 1
+         
+    Just as in the Deutsch-Jozsa algorithm, the constant function doesn't result in any "phase kickback" on the input qubit.
+    But, the balanced function produces a phase kick of pi when the input is |1>.
+    
+    This leads to the following two distinct switch states:
+        |0> + |1> for the CONSTANT FUNCTION (switch not working)
+        |0> - |1> for the BALANCED FUNCTION (switch working)
+        
+    Implementing Hadamard gates on the switch qubits produces the following states:
+        |0> CONSTANT FUNCTION (switch not working)
+        |1> BALANCED FUNCTION( switch working)
+    
+    So, measuring the switches in the computational basis state (via qml.sample) produces an array that encodes which switches are working.
+    Every "1" in the array corresponds to a working switch.
+    Generating a list of the array indices that have the element "1" creates a list of the working switches, thus solving the problem.
+    
+    *Pre processing
+    Initialize the switch qubits as if we’re performing the Deutsch-Jozsa algorithm"""
+    for i in range(n_switches):
+        qml.Hadamard(wires=i)
+
+    #initialize ancilla light qubit to |0> - |1>
+    qml.PauliX(wires="light")
+    qml.Hadamard(wires="light")
+
+    # You are allowed to place operations before and after the oracle without any problem.
+    oracle()
+
+    """*Post processing
+    Implement post-oracle unitaries on the switch qubits if we’re performing the Deutsch-Jozsa algorithm"""
+    for i in range(n_switches):
+        qml.Hadamard(wires=i)
+
+    # QHACK #
+
+    return qml.sample(wires=range(n_switches))
+
+
+def _from_truth_table(oracle, n_switches):
+    #the light is f(0) XOR the switches that work and are on, so switch i works if flipping it
+    #alone changes f; None when the oracle has non-classical gates or is not of that form
+    f = oracles.boolean_function(oracles.record(oracle), list(range(n_switches)), "light")
+    if f is None:
+        return None
+
+    bits = 1 << np.arange(n_switches - 1, -1, -1)
+    working = np.flatnonzero(f[bits] != f[0])
+    x = np.arange(2**n_switches)
+    parity = np.zeros_like(x)
+    for bit in bits[working]:
+        parity ^= (x & bit) != 0
+    return working.tolist() if np.array_equal(f, f[0] ^ parity) else None
+
+
+def switch(oracle, device="default.qubit", n_switches=3):
     """Function that, given an oracle, returns a list of switches that work by executing a
     single circuit with a single shot. The code you write for this challenge should be completely
     contained within this function between the # QHACK # comment markers.
 
     Args:
         - oracle (function): oracle that simulates the behavior of the lights.
+        - device (str): device to simulate the circuit on; "qhack.stabilizer" handles tens of switches
+        - n_switches (int): number of switches, on wires 0 .. n_switches - 1
 
     Returns:
         - (list(int)): List with the switches that work. Example: [0,2].
     """
 
-    dev = qml.device("default.qubit", wires=[0, 1, 2, "light"], shots=1)
+    #on the state vector simulator, oracles made of classical reversible gates are answered from their truth table
+    if device == "default.qubit" and n_switches <= TRUTH_TABLE_MAX_SWITCHES:
+        working = _from_truth_table(oracle, n_switches)
+        if working is not None:
+            return working
 
-    @qml.qnode(dev)
-    def circuit():
+    sample = cache.qnode(circuit, device, wires=wires(n_switches), shots=1)(oracle, n_switches)
 
-        # QHACK #
-        """We start solving this problem by, essentially, performing the Deutsch-Joza algorithm with the first switch as the input & the light as the output.
-        We then repeat this process with the second and third switches (and the light).
-        
-        If a switch isn't working, then it won't change the light's state. This is equivalent to the following constant function:
-            f(0) = 0
-            f(1) = 0
-        
-        If a switch is working, then it'll flip the light qubit when the switch's state is |1>. This is equivalent to the following balanced function:
-             f(0) = 0
-             f(1) = 1
-             
-        Just as in the Deutsch-Jozsa algorithm, the constant function doesn't result in any "phase kickback" on the input qubit.
-        But, the balanced function produces a phase kick of pi when the input is |1>.
-        
-        This leads to the following two distinct switch states:
-            |0> + |1> for the CONSTANT FUNCTION (switch not working)
-            |0> - |1> for the BALANCED FUNCTION (switch working)
-            
-        Implementing Hadamard gates on the switch qubits produces the following states:
-            |0> CONSTANT FUNCTION (switch not working)
-            |1> BALANCED FUNCTION( switch working)
-        
-        So, measuring the switches in the computational basis state (via qml.sample) produces an array that encodes which switches are working.
-        Every "1" in the array corresponds to a working switch.
-        Generating a list of the array indices that have the element "1" creates a list of the working switches, thus solving the problem.
-        
-        *Pre processing
-        Initialize the switch qubits as if we’re performing the Deutsch-Jozsa algorithm"""
-        for i in range(3):
-            qml.Hadamard(wires=i)
+    # QHACK #
 
-        #initialize ancilla light qubit to |0> - |1>
-        qml.PauliX(wires="light")
-        qml.Hadamard(wires="light")
+    # Process the received sample and return the requested list.
 
-        # You are allowed to place operations before and after the oracle without any problem.
-        oracle()
+    return np.flatnonzero(np.reshape(sample, -1)).tolist()
 
-        """*Post processing
-        Implement post-oracle unitaries on the switch qubits if we’re performing the Deutsch-Jozsa algorithm"""
-        for i in range(3):
-            qml.Hadamard(wires=i)
+    # QHACK #
 
-        # QHACK #
 
-        return qml.sample(wires=range(3))
+def switches(oracle_list, device="default.qubit", n_switches=3):
+    """Finds the working switches of many switchboards, running every circuit in one batched device execution.
 
-    sample = circuit()
+    Args:
+        - oracle_list (list(function)): oracles, as for ``switch``
+        - device (str): device to run the circuits on
+        - n_switches (int): number of switches of every switchboard
 
-    # QHACK #
+    Returns:
+        - (list(list(int))): the working switches of every oracle
+    """
 
-    
+    answers = [None] * len(oracle_list)
+    if device == "default.qubit" and n_switches <= TRUTH_TABLE_MAX_SWITCHES:
+        answers = [_from_truth_table(oracle, n_switches) for oracle in oracle_list]
 
-    # Process the received sample and return the requested list.
+    pending = [k for k, answer in enumerate(answers) if answer is None]
+    if pending:
+        tapes = []
+        for k in pending:
+            with qml.tape.stop_recording(), qml.tape.QuantumTape() as tape:
+                circuit(oracle_list[k], n_switches)
+            tapes.append(tape)
 
-    workingSwitches=[]
+        results = qml.execute(tapes, cache.device(device, wires(n_switches), 1), gradient_fn=None)
+        samples = np.reshape(np.stack(results), (len(pending), n_switches))
+        for k, sample in zip(pending, samples):
+            answers[k] = np.flatnonzero(sample).tolist()
 
-    for i in range(3):
-        if sample[i] == 1:
-            workingSwitches.append(i) 
+    return answers
 
-    return workingSwitches
 
-    # QHACK #
+def switch_vote(oracle, shots, device="default.qubit", n_switches=3):
+    """Finds the working switches from many shots of one circuit execution, for noisy devices.
+
+    Args:
+        - oracle (function): as for ``switch``
+        - shots (int): number of shots, each of which votes for a set of switches
+        - device (str): device to run the circuit on
+        - n_switches (int): number of switches
+
+    Returns:
+        - (list(int)): the switches that work according to most shots
+        - (float): fraction of shots that agree with them
+    """
+
+    samples = cache.qnode(circuit, device, wires=wires(n_switches), shots=shots)(oracle, n_switches)
+    working, confidence = oracles.majority(np.reshape(samples, (shots, -1)))
+    return np.flatnonzero(working).tolist(), float(confidence)
 
 
 if __name__ == "__main__":
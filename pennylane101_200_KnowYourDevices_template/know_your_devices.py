@@ -1,9 +1,12 @@
 #! /usr/bin/python3
 
+import functools
 import sys
 import pennylane as qml
 from pennylane import numpy as np
 
+from qhack import cache
+
 
 def matrix_norm(mixed_state, pure_state):
     """Computes the matrix one-norm of the difference between mixed and pure states.
@@ -19,6 +22,22 @@ def matrix_norm(mixed_state, pure_state):
     return np.sum(np.abs(mixed_state - np.outer(pure_state, np.conj(pure_state))))
 
 
+def ry_circuit(angles, num_wires):
+    """A circuit that contains `num_wires` y-rotation gates.
+
+    Args:
+        - angles (np.ndarray): angle of the y-rotation on each wire
+        - num_wires (int): The number of qubits / wires
+
+    Returns:
+        - (np.tensor): A state vector on "default.qubit", a density matrix on "default.mixed"
+    """
+    for i in range(num_wires):
+         qml.RY(angles[i],wires=i)
+
+    return qml.state()
+
+
 def compare_circuits(num_wires, params):
     """Function that returns the matrix norm between the mixed- and pure-state versions of the same state.
 
@@ -32,40 +51,16 @@ def compare_circuits(num_wires, params):
     """
 
     # QHACK #
-    # define devices
-    dev1=qml.device("default.qubit",wires=num_wires)
-    dev2=qml.device("default.mixed",wires=num_wires)
-    
+    #devices and QNodes are cached per number of wires, so repeated calls only run the circuits
     pureArray = params[0]
     mixedArray = params[1]
 
-    @qml.qnode(dev1)
-    def pure_circuit():
-        """A circuit that contains `num_wires` y-rotation gates.
-        The argument params[0] are the parameters you should use here to define the y-rotations.
-
-        Returns:
-            - (np.tensor): A state vector
-        """
-        # create the circuit here
-        for i in range(num_wires):
-             qml.RY(pureArray[i],wires=i)
-        
-        return qml.state()
-
-    @qml.qnode(dev2)
-    def mixed_circuit():
-        """A circuit that contains `num_wires` y-rotation gates.
-        The argument params[1] are the parameters you should use here to define the y-rotations.
-
-        Returns:
-            - (np.tensor): A density matrix
-        """
-        # create the circuit here
-        for i in range(num_wires):
-             qml.RY(mixedArray[i],wires=i)
-            
-        return qml.state()
+    pure_circuit = functools.partial(
+        cache.qnode(ry_circuit, "default.qubit", wires=num_wires), pureArray, num_wires
+    )
+    mixed_circuit = functools.partial(
+        cache.qnode(ry_circuit, "default.mixed", wires=num_wires), mixedArray, num_wires
+    )
 
     # QHACK #
 
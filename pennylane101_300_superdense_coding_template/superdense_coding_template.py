@@ -4,6 +4,8 @@ import sys
 import pennylane as qml
 from pennylane import numpy as np
 
+from qhack import cache
+
 dev = qml.device("default.qubit", wires=2)
 
 
@@ -56,6 +58,21 @@ def superdense_coding(bits, alpha):
     return qml.probs(wires=[0, 1])
 
 
+def probabilities(bits, alpha, device="default.qubit"):
+    """Runs the superdense_coding circuit on another device.
+
+    Args:
+        - bits (int): Alice's bits, 0 to 3
+        - alpha (float): angle parametrizing the entangled state; "qhack.stabilizer" needs a multiple of pi/4
+        - device (str): device name, e.g. "qhack.stabilizer"
+
+    Returns:
+        - (np.tensor): probabilities of Bob's four outcomes
+    """
+
+    return cache.qnode(superdense_coding.func, device, wires=2)(bits, alpha)
+
+
 def return_probs(bits, alpha):
     """Returns the output of the superdense_coding function for a given index (bits)"""
     # DO NOT MODIFY anything in this code block
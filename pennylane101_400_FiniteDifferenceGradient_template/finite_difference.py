@@ -1,33 +1,47 @@
 #! /usr/bin/python3
 
+import functools
 import sys
 import pennylane as qml
 from pennylane import numpy as np
 
+from qhack import cache
+
 dev = qml.device("default.qubit", wires=3)
 
+#QNode options of each gradient backend; "loop" evaluates the central differences one cost call at a time
+GRADIENT_METHODS = {
+    "loop": None,
+    "central": {"diff_method": "finite-diff", "strategy": "center", "approx_order": 2},
+    "parameter-shift": {"diff_method": "parameter-shift"},
+    "adjoint": {"diff_method": "adjoint"},
+}
+
 
-def my_finite_diff_grad(params):
+def my_finite_diff_grad(params, method="central", delta=0.01):
     """Function that returns the gradients of the cost function (defined below) with respect 
     to all parameters in params.
 
     Args:
         - params (np.ndarray): The parameters needed to create the variational circuit.
+        - method (str): gradient backend, one of GRADIENT_METHODS
+        - delta (float): step of the finite difference methods
 
     Returns:
         - gradients (np.ndarray): the gradient w.r.t. each parameter
     """
 
+    return gradient(cost.func, params, dev.wires, method, delta)
+
+
+def _loop_grad(circuit, params, delta):
     gradients = np.zeros([len(params)])
   
     for i in range(len(params)):
 
         # QHACK # 
 
-        #delta is the amount of change to each of the six parameters
-        delta = 0.010000
-
-        #create two arrays to store changed parameters in, one for +delta/2 and one for -delta/2
+        #create two arrays to store changed parameters in, one for +delta and one for -delta
         tmpParams = np.copy(params)
         tmpParamsTwo = np.copy(params)    
         
@@ -36,12 +50,44 @@ def my_finite_diff_grad(params):
         tmpParams[i]-=delta
         
         #calculate gradient with respect to i-th parameter using finite difference method
-        gradients[i]=(cost(tmpParamsTwo)-cost(tmpParams))/(2.0*delta)
+        gradients[i]=(circuit(tmpParamsTwo)-circuit(tmpParams))/(2.0*delta)
         # QHACK #
 
     return gradients
 
 
+def gradient(qfunc, params, wires, method="central", delta=0.01):
+    """Gradient of a quantum function returning one expectation value, run on "default.qubit".
+
+    "central" differences and "parameter-shift" build all their shifted tapes up front and
+    run them in a single batched device execution; "adjoint" needs one forward and one
+    backward pass through the state vector, whatever the number of parameters.
+
+    Args:
+        - qfunc (callable): quantum function taking the parameter array as its only argument
+        - params (np.ndarray): point at which the gradient is taken
+        - wires (int or iterable): wires of the device
+        - method (str): one of GRADIENT_METHODS
+        - delta (float): step of the "loop" and "central" finite differences
+
+    Returns:
+        - (np.ndarray): the gradient w.r.t. each parameter
+    """
+
+    if method not in GRADIENT_METHODS:
+        raise ValueError(f"unknown gradient method {method!r}, expected one of {list(GRADIENT_METHODS)}")
+
+    params = np.array(params, dtype=float, requires_grad=True)
+    if method == "loop":
+        return _loop_grad(cache.qnode(qfunc, "default.qubit", wires), params, delta)
+
+    options = dict(GRADIENT_METHODS[method])
+    if method == "central":
+        options["h"] = delta
+
+    return qml.grad(cache.qnode(qfunc, "default.qubit", wires, **options))(params)
+
+
 def variational_circuit(params):
     """A layered variational circuit. The first layer comprises of x, y, and z rotations on wires
     0, 1, and 2, respectively. The second layer is a ring of CNOT gates. The final layer comprises 
@@ -62,6 +108,55 @@ def variational_circuit(params):
     qml.broadcast(qml.CNOT, wires=[0, 1, 2], pattern="ring")
 
 
+def layered_circuit(params, n_wires, n_layers):
+    """The variational_circuit pattern on any number of wires and layers. Each layer applies
+    an x, y or z rotation to every wire, cycling through the three axes, followed by a ring
+    of CNOT gates. With 3 wires and 2 layers it is exactly variational_circuit.
+
+    Args:
+        - params (np.ndarray): n_layers * n_wires rotation angles, layer by layer
+        - n_wires (int): number of wires
+        - n_layers (int): number of layers
+    """
+
+    rotations = [qml.RX, qml.RY, qml.RZ]
+
+    for layer in range(n_layers):
+        for wire in range(n_wires):
+            rotations[wire % 3](params[layer * n_wires + wire], wires=wire)
+
+        if n_wires > 1:
+            qml.broadcast(qml.CNOT, wires=range(n_wires), pattern="ring")
+
+
+@functools.lru_cache(maxsize=None)
+def scaled_cost(n_wires, n_layers):
+    """Builds the quantum function of a cost like the one below, for a layered_circuit of the
+    given size. The same function object is returned for the same size, so the QNodes built
+    on it by gradient() are cached as well.
+
+    Args:
+        - n_wires (int): number of wires
+        - n_layers (int): number of layers
+
+    Returns:
+        - (callable): quantum function of n_layers * n_wires parameters returning
+        qml.expval(qml.PauliY(0) @ qml.PauliZ(n_wires - 1)), or qml.expval(qml.PauliY(0))
+        on a single wire, where the tensor product would act twice on wire 0
+    """
+
+    if n_wires < 1:
+        raise ValueError(f"scaled_cost needs at least one wire, got {n_wires}")
+
+    def circuit(params):
+        layered_circuit(params, n_wires, n_layers)
+        if n_wires == 1:
+            return qml.expval(qml.PauliY(0))
+        return qml.expval(qml.PauliY(0) @ qml.PauliZ(n_wires - 1))
+
+    return circuit
+
+
 @qml.qnode(dev)
 def cost(params):
     """A QNode that pairs the variational_circuit with an expectation value measurement.
@@ -0,0 +1,6 @@
+"""Tooling shared by the QHack 2022 challenge templates.
+
+Each ``*_template`` directory in the repository root is a self-contained solution script
+that reads one input from ``sys.stdin``. The modules in this package discover those
+scripts, run them against their ``N.in`` / ``N.ans`` fixtures and measure them.
+"""
@@ -0,0 +1,118 @@
+"""Benchmarks for the challenge templates.
+
+``measure`` runs a callable in a forked child process so that every measurement gets its
+own peak RSS, and counts the QNode calls, device executions and gradient evaluations the
+callable triggers while it runs.
+"""
+
+import contextlib
+import functools
+import json
+import multiprocessing
+import resource
+import time
+import traceback
+
+from qhack import lazy
+
+
+COUNTERS = ("qnode_calls", "device_executions", "gradient_evaluations")
+
+
+@contextlib.contextmanager
+def counting():
+    """Counts PennyLane work done inside the ``with`` block.
+
+    Nothing is counted, and PennyLane is not imported, if it has not been imported before
+    entering the block.
+
+    Yields:
+        - (dict): a dictionary with one running total per entry in ``COUNTERS``
+    """
+
+    counts = dict.fromkeys(COUNTERS, 0)
+    if not lazy.is_loaded("pennylane"):
+        yield counts
+        return
+
+    import pennylane as qml  # pylint: disable=import-outside-toplevel
+    from pennylane import _grad  # pylint: disable=import-outside-toplevel
+
+    patches = [
+        (qml.QNode, "__call__", "qnode_calls"),
+        (qml.QubitDevice, "execute", "device_executions"),
+        (_grad.grad, "__call__", "gradient_evaluations"),
+    ]
+
+    originals = []
+    for cls, attr, key in patches:
+        original = cls.__dict__[attr]
+
+        @functools.wraps(original)
+        def wrapper(*args, _original=original, _key=key, **kwargs):
+            counts[_key] += 1
+            return _original(*args, **kwargs)
+
+        originals.append((cls, attr, original))
+        setattr(cls, attr, wrapper)
+
+    try:
+        yield counts
+    finally:
+        for cls, attr, original in originals:
+            setattr(cls, attr, original)
+
+
+def _child(connection, fn, args):
+    with counting() as counts:
+        start = time.perf_counter()
+        try:
+            value, error = fn(*args), None
+        except Exception:
+            value, error = None, traceback.format_exc()
+        seconds = time.perf_counter() - start
+
+    #ru_maxrss is reported in kilobytes on Linux
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    connection.send(dict(counts, value=value, error=error, seconds=seconds, peak_rss_mb=peak_rss_mb))
+    connection.close()
+
+
+def measure(fn, *args):
+    """Runs ``fn(*args)`` in a forked child process and measures it.
+
+    Anything imported by the caller before ``measure`` is shared with the child, so import
+    costs are not part of the measurement unless ``fn`` pays them itself.
+
+    Args:
+        - fn (callable): the function to measure. Its return value must be picklable
+        - args: positional arguments for ``fn``
+
+    Returns:
+        - (dict): ``seconds``, ``peak_rss_mb``, one entry per counter in ``COUNTERS``,
+        the ``value`` returned by ``fn`` and the ``error`` traceback if it raised
+    """
+
+    context = multiprocessing.get_context("fork")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_child, args=(sender, fn, args))
+    process.start()
+    sender.close()
+
+    try:
+        result = receiver.recv()
+    except EOFError:
+        result = dict.fromkeys(COUNTERS, None)
+        result.update(value=None, seconds=None, peak_rss_mb=None)
+        result["error"] = "benchmark process exited without reporting"
+    process.join()
+
+    return result
+
+
+def write_report(report, path):
+    """Writes a report as JSON with sorted keys, so reports from two commits diff cleanly."""
+
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
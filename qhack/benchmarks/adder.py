@@ -0,0 +1,90 @@
+"""Adder benchmark: throughput of the AdderQFT template for many values of m on one register.
+
+Usage::
+
+    python -m qhack.benchmarks.adder [-n WIRES ...] [-m COUNT] [--device-max WIRES] [-o adder.json]
+
+For every register size, ``COUNT`` values of m are added to the same random input state
+with ``adder_probabilities``. The "fft" method runs all of them in one vectorized pass;
+"device" builds one tape per m and runs them in a single batched execution, and "loop" runs
+one execution per m. The device methods are skipped above ``--device-max`` wires.
+"""
+
+import argparse
+import sys
+
+import numpy as onp
+
+from qhack import benchmarks, challenges
+
+
+CHALLENGE = "algorithms_300_AdderQFT_template"
+DEFAULT_WIRES = [4, 8, 12, 16, 20]
+
+
+def _loop(template, state, ms, n_wires):
+    rows = [template.adder_probabilities(state, [m], n_wires, "device") for m in ms]
+    return onp.concatenate(rows)
+
+
+def _method(template, method, state, ms, n_wires):
+    if method == "loop":
+        probabilities = _loop(template, state, ms, n_wires)
+    else:
+        probabilities = template.adder_probabilities(state, ms, n_wires, method)
+    #only a checksum goes back through the pipe, the matrix has 2^n_wires columns
+    return float(onp.sum(probabilities))
+
+
+def run(wires=DEFAULT_WIRES, count=32, device_max=10, seed=0):
+    """Measures each method for every register size.
+
+    Args:
+        - wires (list(int)): register sizes
+        - count (int): number of values of m per register
+        - device_max (int): largest register run with the "device" and "loop" methods
+        - seed (int): seed of the input states and values of m
+
+    Returns:
+        - (dict): number of wires -> method -> measurement, including ``additions_per_second``
+    """
+
+    template, _ = challenges.load(challenges.discover(names=[CHALLENGE])[0])
+    rng = onp.random.default_rng(seed)
+    report = {}
+
+    for n_wires in wires:
+        state = rng.normal(size=2**n_wires) + 1j * rng.normal(size=2**n_wires)
+        state /= onp.linalg.norm(state)
+        ms = rng.integers(0, 2**n_wires, size=count)
+        methods = ["fft"] + (["device", "loop"] if n_wires <= device_max else [])
+
+        report[str(n_wires)] = {}
+        for method in methods:
+            result = benchmarks.measure(_method, template, method, state, ms, n_wires)
+            result["total_probability"] = result.pop("value")
+            result["additions_per_second"] = count / result["seconds"] if result["error"] is None else None
+            report[str(n_wires)][method] = result
+            print(
+                f"{n_wires} wires, {method}: {result['additions_per_second']:.1f} additions/s, "
+                f"{result['peak_rss_mb']:.0f} MB",
+                file=sys.stderr,
+            )
+
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--wires", type=int, nargs="+", default=DEFAULT_WIRES, help="register sizes")
+    parser.add_argument("-m", "--count", type=int, default=32, help="values of m per register")
+    parser.add_argument("--device-max", type=int, default=10, help="largest register simulated gate by gate")
+    parser.add_argument("-o", "--output", default="adder.json", help="where to write the JSON report")
+    args = parser.parse_args(argv)
+
+    benchmarks.write_report(run(args.wires, args.count, args.device_max), args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""Per-challenge benchmark over the ``N.in`` fixtures and synthetic, scaled-up inputs.
+
+Usage::
+
+    python -m qhack.benchmarks.fixtures [-o report.json] [--baseline old.json] [--no-scaled] [NAME ...]
+
+Every input is run through its template's ``__main__`` block in a fresh forked process.
+The report records wall time, peak RSS, QNode calls, device executions and gradient
+evaluations per input. With ``--baseline`` the new timings are compared against an
+earlier report and inputs that got slower than ``--threshold`` are listed.
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+
+from qhack import benchmarks, challenges, runner
+
+
+def _angles(rng, count):
+    return [f"{rng.uniform(0, 2 * math.pi):.8f}" for _ in range(count)]
+
+
+def _adder(rng, n_wires):
+    return f"{rng.randrange(2 ** n_wires)},{n_wires}"
+
+
+def _know_your_devices(rng, num_wires):
+    return ",".join([str(num_wires)] + _angles(rng, 2 * num_wires))
+
+
+def _elitzur_vaidman(rng, n):
+    #a photon survives each of the n bombs with probability sin^2(angle), so the angle has to be
+    #close to pi/2 for any photon to get through all of them
+    return f"{math.pi / 2 - math.pi / (4 * n):.8f},{n}"
+
+
+def _particle_preserving(rng, n_wires):
+    gates = []
+    for _ in range(3 * n_wires):
+        wires = rng.sample(range(n_wires), 2)
+        if rng.random() < 0.5:
+            gates.append(f"SingleExcitation;{wires[0]},{wires[1]};{rng.uniform(0, math.pi):.6f}")
+        else:
+            gates.append(f"CNOT;{wires[0]},{wires[1]}")
+    return ";".join([str(n_wires)] + gates)
+
+
+def _optimizing_measurements(rng, n_terms, n_qubits=8):
+    words = [rng.choice("IXYZ") for _ in range(n_terms * n_qubits)]
+    return ",".join([str(n_qubits)] + words)
+
+
+def _beatles(rng, n_people):
+    tokens = [str(rng.randint(10, 80)), str(rng.randint(10, 300)), "3"]
+    for _ in range(n_people):
+        tokens += [str(rng.randint(10, 80)), str(rng.randint(10, 300)), rng.choice(["YES", "NO"])]
+    return ",".join(tokens)
+
+
+def _udmis(rng, num_vertices):
+    coordinates = [f"{rng.uniform(0, 2):.6f}" for _ in range(2 * num_vertices)]
+    return ",".join(coordinates)
+
+
+#challenge name -> (input generator, scales); a generator takes a seeded RNG and one scale
+SCALED_INPUTS = {
+    "algorithms_300_AdderQFT_template": (_adder, [6, 8, 10]),
+    "games_300_Elitzur_Vaidman_template": (_elitzur_vaidman, [10]),
+    "pennylane101_200_KnowYourDevices_template": (_know_your_devices, [6, 8]),
+    "qchem_100_IsParticlePreserving_template": (_particle_preserving, [6]),
+    "qchem_200_OptimizingMeasurements_template": (_optimizing_measurements, [100, 1000]),
+    "qml_200_WhoLikesTheBeatles_template": (_beatles, [50]),
+    "qml_500_UDMIS_template": (_udmis, [6]),
+}
+
+
+def _inputs(challenge, scaled):
+    for case in challenge.cases:
+        yield case.name, challenges.read(case.input_path), case.answer_path
+
+    if scaled and challenge.name in SCALED_INPUTS:
+        generator, scales = SCALED_INPUTS[challenge.name]
+        for scale in scales:
+            yield f"scaled-{scale}", generator(random.Random(scale), scale), None
+
+
+def run(selected, scaled=True):
+    """Benchmarks the selected challenges.
+
+    Args:
+        - selected (list(challenges.Challenge)): challenges to benchmark
+        - scaled (bool): whether to include the synthetic inputs from ``SCALED_INPUTS``
+
+    Returns:
+        - (dict): challenge name -> input name -> measurement
+    """
+
+    report = {}
+    runner.warm_up(selected)
+
+    for challenge in selected:
+        challenges.load(challenge)
+        report[challenge.name] = {}
+
+        for name, stdin_text, answer_path in _inputs(challenge, scaled):
+            result = benchmarks.measure(challenges.run_main, challenge, stdin_text)
+            output = result.pop("value")
+
+            if result["error"] is not None:
+                result["status"] = "error"
+            elif answer_path is None:
+                result["status"] = "ok"
+            else:
+                passed = runner.compare(challenge.name, output, challenges.read(answer_path))
+                result["status"] = "pass" if passed else "fail"
+
+            report[challenge.name][name] = result
+            print(
+                f"{challenge.name}/{name}: {result['status']}, {result['seconds']:.3f}s, "
+                f"{result['peak_rss_mb']:.0f} MB, {result['device_executions']} executions",
+                file=sys.stderr,
+            )
+
+    return report
+
+
+def regressions(report, baseline, threshold):
+    """Lists the inputs whose wall time grew by more than ``threshold`` relative to ``baseline``.
+
+    Returns:
+        - (list(tuple)): (challenge, input, old seconds, new seconds)
+    """
+
+    slower = []
+    for challenge, results in report.items():
+        for name, result in results.items():
+            old = baseline.get(challenge, {}).get(name)
+            if not old or old.get("seconds") is None or result["seconds"] is None:
+                continue
+            if result["seconds"] > old["seconds"] * (1 + threshold):
+                slower.append((challenge, name, old["seconds"], result["seconds"]))
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", help="only benchmark challenges whose name contains one of these")
+    parser.add_argument("-o", "--output", default="benchmark.json", help="where to write the JSON report")
+    parser.add_argument("--no-scaled", action="store_true", help="only run the N.in fixtures")
+    parser.add_argument("--baseline", help="earlier report to compare wall times against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="relative slowdown reported as a regression")
+    args = parser.parse_args(argv)
+
+    report = run(challenges.discover(names=args.names), scaled=not args.no_scaled)
+    benchmarks.write_report(report, args.output)
+
+    slower = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        slower = regressions(report, baseline, args.threshold)
+        for challenge, name, old, new in slower:
+            print(f"REGRESSION {challenge}/{name}: {old:.3f}s -> {new:.3f}s")
+
+    failed = [
+        (challenge, name) for challenge, results in report.items()
+        for name, result in results.items() if result["status"] in ("error", "fail")
+    ]
+    for challenge, name in failed:
+        print(f"{report[challenge][name]['status'].upper()} {challenge}/{name}")
+    return 1 if failed or slower else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""Gradient benchmark: speed and accuracy of each backend of the FiniteDifferenceGradient template.
+
+Usage::
+
+    python -m qhack.benchmarks.gradients [-w WIRES ...] [-l LAYERS ...] [-o gradients.json]
+
+For every (wires, layers) pair of the grid, the template's ``scaled_cost`` circuit is
+differentiated with every backend in ``GRADIENT_METHODS``, each in its own forked process
+once its QNodes have been built. The report gives gradient evaluations per second, device
+executions and the largest deviation from the adjoint gradient, which is exact.
+"""
+
+import argparse
+import sys
+
+import numpy as onp
+
+from qhack import benchmarks, challenges
+
+
+CHALLENGE = "pennylane101_400_FiniteDifferenceGradient_template"
+DEFAULT_WIRES = [3, 5, 7]
+DEFAULT_LAYERS = [2, 4, 8]
+
+
+def _gradient(template, n_wires, n_layers, params, method):
+    return template.gradient(template.scaled_cost(n_wires, n_layers), params, n_wires, method).tolist()
+
+
+def run(wires=DEFAULT_WIRES, layers=DEFAULT_LAYERS, seed=0):
+    """Measures every gradient backend on a grid of circuit sizes.
+
+    Args:
+        - wires (list(int)): numbers of wires
+        - layers (list(int)): numbers of layers
+        - seed (int): seed of the random parameters
+
+    Returns:
+        - (dict): "<wires>x<layers>" -> method -> measurement, including ``evaluations_per_second``
+        and ``max_error`` against the adjoint gradient
+    """
+
+    template, _ = challenges.load(challenges.discover(names=[CHALLENGE])[0])
+    rng = onp.random.default_rng(seed)
+    report = {}
+
+    for n_wires in wires:
+        for n_layers in layers:
+            params = rng.uniform(0, 2 * onp.pi, n_wires * n_layers)
+            results = {}
+            for method in template.GRADIENT_METHODS:
+                #build the cached QNodes in the parent so the forked measurement only times the gradient
+                _gradient(template, n_wires, n_layers, params, method)
+                results[method] = benchmarks.measure(_gradient, template, n_wires, n_layers, params, method)
+            exact = onp.array(results["adjoint"]["value"])
+
+            for method, result in results.items():
+                value = result.pop("value")
+                if value is None:
+                    result["max_error"] = result["evaluations_per_second"] = None
+                    continue
+
+                result["max_error"] = float(onp.max(onp.abs(onp.array(value) - exact)))
+                result["evaluations_per_second"] = 1 / result["seconds"]
+                print(
+                    f"{n_wires} wires x {n_layers} layers, {method}: "
+                    f"{result['evaluations_per_second']:.2f} evaluations/s, "
+                    f"{result['device_executions']} executions, max error {result['max_error']:.1e}",
+                    file=sys.stderr,
+                )
+
+            report[f"{n_wires}x{n_layers}"] = results
+
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-w", "--wires", type=int, nargs="+", default=DEFAULT_WIRES, help="numbers of wires")
+    parser.add_argument("-l", "--layers", type=int, nargs="+", default=DEFAULT_LAYERS, help="numbers of layers")
+    parser.add_argument("-o", "--output", default="gradients.json", help="where to write the JSON report")
+    args = parser.parse_args(argv)
+
+    benchmarks.write_report(run(args.wires, args.layers), args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""Partial-trace benchmark: reduced density matrices of large state vectors with ``qhack.density``.
+
+Usage::
+
+    python -m qhack.benchmarks.partial_trace [-n WIRES ...] [--device-max WIRES] [-o partial_trace.json]
+
+For every number of wires, a random state vector is built once, and the density matrix of
+one wire and of a few non-adjacent wires is computed with three methods: "einsum" is
+``density.reduced_density_matrix``, which copies at most ``max_entries`` amplitudes at a
+time; "transpose" moves the kept wires to the front of a full copy of the state and
+multiplies it by its adjoint; "device" loads the state into "default.qubit" and returns
+``qml.density_matrix``, and is skipped above ``--device-max`` wires. The report gives time,
+peak memory, which includes the state itself, and the largest deviation from "transpose".
+"""
+
+import argparse
+import sys
+
+import numpy as onp
+import pennylane as qml
+
+from qhack import benchmarks, density
+
+
+DEFAULT_WIRES = [12, 16, 20, 22, 24]
+METHODS = ["einsum", "transpose", "device"]
+
+
+def _transpose(state, keep):
+    n_wires = density.n_wires_of(state)
+    traced = [w for w in range(n_wires) if w not in keep]
+    psi = onp.transpose(state.reshape((2,) * n_wires), keep + traced).reshape(2 ** len(keep), -1)
+    return psi @ psi.conj().T
+
+
+def _device(state, keep):
+    n_wires = density.n_wires_of(state)
+
+    @qml.qnode(qml.device("default.qubit", wires=n_wires))
+    def circuit():
+        qml.QubitStateVector(state, wires=range(n_wires))
+        #density_matrix returns the wires in increasing order
+        return qml.density_matrix(sorted(keep))
+
+    return onp.asarray(circuit())
+
+
+def _reduce(method, state, keep):
+    if method == "einsum":
+        return density.reduced_density_matrix(state, keep)
+    if method == "transpose":
+        return _transpose(state, keep)
+    return _device(state, keep)
+
+
+def subsystems(n_wires):
+    """Wires kept in the benchmark: wire 1, and every other wire from 0, up to six of them."""
+
+    return {"one": [1], "several": list(range(0, 2 * min(n_wires // 2, 6), 2))}
+
+
+def run(wires=DEFAULT_WIRES, device_max=16, seed=0):
+    """Measures every method for every number of wires and subsystem.
+
+    Args:
+        - wires (list(int)): numbers of wires of the random states
+        - device_max (int): largest number of wires run with the "device" method
+        - seed (int): seed of the random states
+
+    Returns:
+        - (dict): "<wires>/<subsystem>" -> method -> measurement, including ``max_error``
+    """
+
+    rng = onp.random.default_rng(seed)
+    report = {}
+
+    for n_wires in wires:
+        #the state is shared with the forked measurements, so it counts towards every peak
+        state = rng.normal(size=2**n_wires) + 1j * rng.normal(size=2**n_wires)
+        state /= onp.linalg.norm(state)
+        methods = METHODS if n_wires <= device_max else METHODS[:2]
+
+        for name, keep in subsystems(n_wires).items():
+            results = {method: benchmarks.measure(_reduce, method, state, keep) for method in methods}
+            exact = results["transpose"]["value"]
+
+            for method, result in results.items():
+                value = result.pop("value")
+                result["max_error"] = None if value is None or exact is None else float(onp.abs(value - exact).max())
+                print(
+                    f"{n_wires} wires, keep {keep}, {method}: {result['seconds']:.3f}s, "
+                    f"{result['peak_rss_mb']:.0f} MB, max error {result['max_error']:.1e}",
+                    file=sys.stderr,
+                )
+
+            report[f"{n_wires}/{name}"] = results
+
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--wires", type=int, nargs="+", default=DEFAULT_WIRES, help="numbers of wires")
+    parser.add_argument("--device-max", type=int, default=16, help="largest state loaded into default.qubit")
+    parser.add_argument("-o", "--output", default="partial_trace.json", help="where to write the JSON report")
+    args = parser.parse_args(argv)
+
+    benchmarks.write_report(run(args.wires, args.device_max), args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""Routing benchmark: the AdaptingTopology ``route`` pass on random circuits and large coupling maps.
+
+Usage::
+
+    python -m qhack.benchmarks.routing [-g GATES] [-o routing.json]
+
+Random CNOT circuits are routed on heavy-hex and square-grid coupling maps of tens to
+hundreds of qubits, each in its own forked process. The report gives wall time, SWAP
+count, depth and whether the routed circuit was checked to be valid.
+"""
+
+import argparse
+import random
+import sys
+
+from qhack import benchmarks, challenges
+
+
+CHALLENGE = "algorithms_200_AdaptingTopology_template"
+
+
+def grid(rows, columns):
+    """Square lattice with nearest-neighbour couplings."""
+
+    coupling = {}
+    for r in range(rows):
+        for c in range(columns):
+            neighbours = [(r + dr, c + dc) for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1))]
+            coupling[r * columns + c] = [
+                nr * columns + nc for nr, nc in neighbours if 0 <= nr < rows and 0 <= nc < columns
+            ]
+    return coupling
+
+
+def heavy_hex(rows, columns):
+    """IBM-style heavy-hex lattice: ``rows`` chains of ``columns`` qubits, joined by bridge
+    qubits every fourth column, offset by two columns on every other row."""
+
+    coupling = {r * columns + c: [] for r in range(rows) for c in range(columns)}
+
+    def connect(a, b):
+        coupling.setdefault(a, []).append(b)
+        coupling.setdefault(b, []).append(a)
+
+    for r in range(rows):
+        for c in range(columns - 1):
+            connect(r * columns + c, r * columns + c + 1)
+
+    bridge = rows * columns
+    for r in range(rows - 1):
+        for c in range(2 * (r % 2), columns, 4):
+            connect(r * columns + c, bridge)
+            connect(bridge, (r + 1) * columns + c)
+            bridge += 1
+
+    return coupling
+
+
+def random_circuit(rng, coupling, n_gates):
+    """CNOTs between uniformly random pairs of distinct qubits of the coupling map."""
+
+    qubits = list(coupling)
+    return [tuple(rng.sample(qubits, 2)) for _ in range(n_gates)]
+
+
+def check(circuit, coupling, routing):
+    """Replays a routing and checks it runs the circuit's CNOTs, in order per qubit, on coupled qubits."""
+
+    occupant = {q: q for q in coupling}
+    executed = []
+    for name, (a, b) in routing.gates:
+        if b not in coupling[a]:
+            return False
+        if name == "SWAP":
+            occupant[a], occupant[b] = occupant[b], occupant[a]
+        else:
+            executed.append((occupant[a], occupant[b]))
+
+    #the routed order may interleave independent gates, but per qubit it must match the circuit
+    def per_qubit(gates):
+        order = {}
+        for gate in gates:
+            for q in gate:
+                order.setdefault(q, []).append(gate)
+        return order
+
+    return sorted(executed) == sorted(circuit) and per_qubit(executed) == per_qubit(circuit)
+
+
+def _route(template, circuit, coupling):
+    routing = template.route(circuit, coupling)
+    return {"swaps": routing.swaps, "depth": routing.depth, "valid": check(circuit, coupling, routing)}
+
+
+TOPOLOGIES = {
+    "grid-8x8": lambda: grid(8, 8),
+    "grid-20x20": lambda: grid(20, 20),
+    "heavy-hex-7x15": lambda: heavy_hex(7, 15),
+    "heavy-hex-13x27": lambda: heavy_hex(13, 27),
+}
+
+
+def run(n_gates=250, seed=0):
+    """Routes one random circuit per topology in ``TOPOLOGIES``.
+
+    Args:
+        - n_gates (int): number of CNOTs in each random circuit
+        - seed (int): seed of the random circuits
+
+    Returns:
+        - (dict): topology -> measurement with ``qubits``, ``swaps``, ``depth`` and ``valid``
+    """
+
+    template, _ = challenges.load(challenges.discover(names=[CHALLENGE])[0])
+    rng = random.Random(seed)
+    report = {}
+
+    for name, build in TOPOLOGIES.items():
+        coupling = build()
+        circuit = random_circuit(rng, coupling, n_gates)
+        #the distance table is cached per graph; build it outside the measurement
+        template.distances(coupling)
+
+        result = benchmarks.measure(_route, template, circuit, coupling)
+        result.update(result.pop("value") or {}, qubits=len(coupling), gates=n_gates)
+        report[name] = result
+        print(
+            f"{name} ({len(coupling)} qubits): {result['seconds']:.3f}s, "
+            f"{result.get('swaps')} swaps, depth {result.get('depth')}, valid {result.get('valid')}",
+            file=sys.stderr,
+        )
+
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-g", "--gates", type=int, default=250, help="CNOTs per random circuit")
+    parser.add_argument("-o", "--output", default="routing.json", help="where to write the JSON report")
+    args = parser.parse_args(argv)
+
+    report = run(args.gates)
+    benchmarks.write_report(report, args.output)
+    return 0 if all(result.get("valid") for result in report.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""Stabilizer benchmark: the DeutschJozsa template on the tableau device against default.qubit.
+
+Usage::
+
+    python -m qhack.benchmarks.stabilizer [-n INPUTS ...] [--statevector-max INPUTS] [-o stabilizer.json]
+
+For every number of input qubits, the template's Deutsch-Jozsa ``circuit`` is run with a
+random balanced oracle (CNOTs from a random half of the inputs into the ancilla) and a
+constant one, on "qhack.stabilizer" and, up to ``--statevector-max`` inputs, on
+"default.qubit". The circuit is simulated on both devices, bypassing the template's
+truth-table shortcut. The report gives the time per circuit, peak memory and whether both
+oracles were classified correctly.
+"""
+
+import argparse
+import functools
+import random
+import sys
+
+import pennylane as qml
+
+from qhack import benchmarks, cache, challenges
+
+
+CHALLENGE = "algorithms_100_DeutschJozsa_template"
+DEVICES = ["qhack.stabilizer", "default.qubit"]
+DEFAULT_INPUTS = [4, 8, 12, 16, 50, 100, 200, 400]
+
+
+def _parity_oracle(inputs, output):
+    for i in inputs:
+        qml.CNOT(wires=[i, output])
+
+
+def _constant_oracle(output):
+    qml.PauliX(wires=output)
+
+
+def _classify(template, device, n_inputs, balanced, constant):
+    qnode = cache.qnode(template.circuit, device, wires=n_inputs + 1, shots=1)
+    #a constant oracle leaves every input in |0>, a balanced one does not
+    return [bool(qnode(balanced, n_inputs).any()), not qnode(constant, n_inputs).any()]
+
+
+def run(inputs=DEFAULT_INPUTS, statevector_max=16, seed=0):
+    """Measures both devices for every number of input qubits.
+
+    Args:
+        - inputs (list(int)): numbers of input qubits
+        - statevector_max (int): largest number of inputs run on "default.qubit"
+        - seed (int): seed of the balanced oracles
+
+    Returns:
+        - (dict): number of inputs -> device -> measurement, including ``seconds_per_circuit`` and ``correct``
+    """
+
+    template, _ = challenges.load(challenges.discover(names=[CHALLENGE])[0])
+    rng = random.Random(seed)
+    report = {}
+
+    for n_inputs in inputs:
+        balanced = functools.partial(_parity_oracle, rng.sample(range(n_inputs), n_inputs // 2), n_inputs)
+        constant = functools.partial(_constant_oracle, n_inputs)
+        devices = DEVICES if n_inputs <= statevector_max else DEVICES[:1]
+
+        report[str(n_inputs)] = {}
+        for device in devices:
+            result = benchmarks.measure(_classify, template, device, n_inputs, balanced, constant)
+            value = result.pop("value")
+            result["correct"] = value is not None and all(value)
+            result["seconds_per_circuit"] = result["seconds"] / 2
+            report[str(n_inputs)][device] = result
+            print(
+                f"{n_inputs} inputs, {device}: {result['seconds_per_circuit']:.4f}s per circuit, "
+                f"{result['peak_rss_mb']:.0f} MB, correct {result['correct']}",
+                file=sys.stderr,
+            )
+
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--inputs", type=int, nargs="+", default=DEFAULT_INPUTS, help="numbers of input qubits")
+    parser.add_argument(
+        "--statevector-max", type=int, default=16, help="largest number of inputs simulated on default.qubit"
+    )
+    parser.add_argument("-o", "--output", default="stabilizer.json", help="where to write the JSON report")
+    args = parser.parse_args(argv)
+
+    report = run(args.inputs, args.statevector_max)
+    benchmarks.write_report(report, args.output)
+    return 0 if all(result["correct"] for row in report.values() for result in row.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
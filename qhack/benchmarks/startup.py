@@ -0,0 +1,73 @@
+"""Startup benchmark: how long it takes to import each template in a fresh interpreter.
+
+Usage::
+
+    python -m qhack.benchmarks.startup [-r REPEATS] [-o startup.json] [NAME ...]
+
+Each template is loaded (everything except its ``__main__`` block) in a new Python
+process, and the time of an empty interpreter is subtracted. ``import pennylane`` is
+measured the same way as a reference, so templates that avoid it, or defer it through
+``qhack.lazy``, show up as starting in milliseconds.
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+
+from qhack import benchmarks, challenges
+
+
+_LOAD = "from qhack import challenges; challenges.load(challenges.discover(names=[{name!r}])[0])"
+
+
+def _best_of(code, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, cwd=challenges.ROOT, stderr=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(selected, repeats=3):
+    """Measures the import time of the selected templates.
+
+    Args:
+        - selected (list(challenges.Challenge)): challenges to measure
+        - repeats (int): number of fresh processes per measurement; the fastest one is kept
+
+    Returns:
+        - (dict): milliseconds per template plus the "python" and "import pennylane" references
+    """
+
+    interpreter = _best_of("pass", repeats)
+    report = {
+        "python": interpreter * 1000,
+        "import pennylane": (_best_of("import pennylane", repeats) - interpreter) * 1000,
+        "templates": {},
+    }
+
+    for challenge in selected:
+        seconds = _best_of(_LOAD.format(name=challenge.name), repeats) - interpreter
+        report["templates"][challenge.name] = seconds * 1000
+        print(f"{challenge.name}: {seconds * 1000:.1f} ms", file=sys.stderr)
+
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", help="only measure challenges whose name contains one of these")
+    parser.add_argument("-r", "--repeats", type=int, default=3, help="fresh processes per measurement")
+    parser.add_argument("-o", "--output", default="startup.json", help="where to write the JSON report")
+    args = parser.parse_args(argv)
+
+    report = run(challenges.discover(names=args.names), args.repeats)
+    benchmarks.write_report(report, args.output)
+    print(f"import pennylane: {report['import pennylane']:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""Device and QNode reuse across calls.
+
+Several templates build a new ``qml.device`` and decorate a new ``@qml.qnode`` on every
+call of their entry function. This module keeps both in least-recently-used caches keyed
+on the device name, wires and shots, so repeated calls only pay for executing the circuit::
+
+    def circuit(oracle):
+        ...
+
+    sample = cache.qnode(circuit, "default.qubit", wires=3, shots=1)(oracle)
+
+The quantum function has to be defined once (e.g. at module level) and receive everything
+that changes between calls as arguments, since it is part of the QNode cache key. Cached
+devices are shared, so they must not be executed concurrently from several threads.
+"""
+
+import functools
+import importlib
+
+import pennylane as qml
+
+
+DEVICE_CACHE_SIZE = 32
+QNODE_CACHE_SIZE = 128
+
+#devices defined in this package rather than registered as PennyLane plugins: name -> "module:class"
+LOCAL_DEVICES = {"qhack.stabilizer": "qhack.stabilizer:StabilizerDevice"}
+
+
+def _wires_key(wires):
+    if isinstance(wires, int):
+        return wires
+    return tuple(wires)
+
+
+@functools.lru_cache(maxsize=DEVICE_CACHE_SIZE)
+def _device(name, wires, shots):
+    wires = wires if isinstance(wires, int) else list(wires)
+    if name in LOCAL_DEVICES:
+        module, cls = LOCAL_DEVICES[name].split(":")
+        return getattr(importlib.import_module(module), cls)(wires=wires, shots=shots)
+    return qml.device(name, wires=wires, shots=shots)
+
+
+@functools.lru_cache(maxsize=QNODE_CACHE_SIZE)
+def _qnode(func, name, wires, shots, options):
+    return qml.QNode(func, _device(name, wires, shots), **dict(options))
+
+
+def device(name, wires, shots=None):
+    """Returns a cached device, creating it on first use.
+
+    Args:
+        - name (str): device name, e.g. "default.qubit", or one of ``LOCAL_DEVICES``
+        - wires (int or iterable): number of wires or wire labels
+        - shots (int): number of shots, None for analytic results
+
+    Returns:
+        - (qml.Device): the shared device for this (name, wires, shots)
+    """
+
+    return _device(name, _wires_key(wires), shots)
+
+
+def qnode(func, name, wires, shots=None, **options):
+    """Returns a cached QNode that runs ``func`` on a cached device.
+
+    Args:
+        - func (callable): the quantum function
+        - name (str): device name, e.g. "default.qubit"
+        - wires (int or iterable): number of wires or wire labels
+        - shots (int): number of shots, None for analytic results
+        - options: keyword arguments for ``qml.QNode``, e.g. ``diff_method``
+
+    Returns:
+        - (qml.QNode): the shared QNode for this function, device and options
+    """
+
+    return _qnode(func, name, _wires_key(wires), shots, tuple(sorted(options.items())))
+
+
+def clear():
+    """Drops every cached device and QNode."""
+
+    _qnode.cache_clear()
+    _device.cache_clear()
+
+
+def info():
+    """Hit and miss statistics of both caches, as returned by ``functools.lru_cache``."""
+
+    return {"devices": _device.cache_info(), "qnodes": _qnode.cache_info()}
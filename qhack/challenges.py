@@ -0,0 +1,165 @@
+"""Discovery and in-process execution of the challenge templates.
+
+A template is split in two when it is loaded: everything above its
+``if __name__ == "__main__":`` block is executed once, and the body of that block is
+compiled so it can be replayed against any number of inputs without paying the
+``import pennylane`` cost again.
+"""
+
+import ast
+import contextlib
+import glob
+import io
+import os
+import sys
+import types
+from collections import namedtuple
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+Challenge = namedtuple("Challenge", ["name", "directory", "script", "cases"])
+Case = namedtuple("Case", ["name", "input_path", "answer_path"])
+
+#scripts already loaded in this process, keyed by path: (module, compiled __main__ body)
+_loaded = {}
+
+
+def _case_key(path):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return (0, int(stem), stem) if stem.isdigit() else (1, 0, stem)
+
+
+def discover(root=ROOT, names=None):
+    """Finds every challenge directory together with its fixtures.
+
+    Args:
+        - root (str): directory holding the ``*_template`` folders
+        - names (list(str)): optional substrings; only challenges whose name contains one of them are returned
+
+    Returns:
+        - (list(Challenge)): challenges sorted by name, each with its cases sorted numerically
+    """
+
+    challenges = []
+
+    for directory in sorted(glob.glob(os.path.join(root, "*_template"))):
+        name = os.path.basename(directory)
+        if names and not any(n in name for n in names):
+            continue
+
+        scripts = glob.glob(os.path.join(directory, "*.py"))
+        if len(scripts) != 1:
+            raise RuntimeError(f"{name}: expected exactly one solution script, found {len(scripts)}")
+
+        cases = []
+        for input_path in sorted(glob.glob(os.path.join(directory, "*.in")), key=_case_key):
+            answer_path = os.path.splitext(input_path)[0] + ".ans"
+            cases.append(
+                Case(
+                    os.path.basename(input_path),
+                    input_path,
+                    answer_path if os.path.exists(answer_path) else None,
+                )
+            )
+
+        challenges.append(Challenge(name, directory, scripts[0], cases))
+
+    return challenges
+
+
+def _is_main_guard(node):
+    return (
+        isinstance(node, ast.If)
+        and isinstance(node.test, ast.Compare)
+        and isinstance(node.test.left, ast.Name)
+        and node.test.left.id == "__name__"
+    )
+
+
+def _parse(challenge):
+    with open(challenge.script) as f:
+        return ast.parse(f.read(), filename=challenge.script)
+
+
+def eager_imports(challenge):
+    """Lists the top-level packages a template imports as soon as it is loaded.
+
+    Imports made through ``qhack.lazy`` or inside the ``__main__`` block are not included.
+
+    Args:
+        - challenge (Challenge): the challenge to inspect
+
+    Returns:
+        - (set(str)): top-level package names, e.g. {"sys", "pennylane"}
+    """
+
+    names = set()
+    for node in _parse(challenge).body:
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            names.add(node.module.split(".")[0])
+    return names
+
+
+def load(challenge):
+    """Imports a template once and compiles its ``__main__`` block for replay.
+
+    Args:
+        - challenge (Challenge): the challenge to load
+
+    Returns:
+        - (module): the template module, without its ``__main__`` block executed
+        - (code): the compiled body of the ``__main__`` block
+    """
+
+    if challenge.script in _loaded:
+        return _loaded[challenge.script]
+
+    body, main = [], []
+    for node in _parse(challenge).body:
+        if _is_main_guard(node):
+            main.extend(node.body)
+        else:
+            body.append(node)
+
+    module = types.ModuleType(challenge.name)
+    module.__file__ = challenge.script
+    sys.modules[challenge.name] = module
+
+    exec(compile(ast.Module(body=body, type_ignores=[]), challenge.script, "exec"), module.__dict__)
+    main_code = compile(ast.Module(body=main, type_ignores=[]), challenge.script, "exec")
+
+    _loaded[challenge.script] = (module, main_code)
+    return _loaded[challenge.script]
+
+
+def run_main(challenge, stdin_text):
+    """Feeds one input through a template's ``__main__`` block.
+
+    Args:
+        - challenge (Challenge): the challenge to run
+        - stdin_text (str): what the template would have read from ``sys.stdin``
+
+    Returns:
+        - (str): everything the block printed, without surrounding whitespace
+    """
+
+    module, main_code = load(challenge)
+    stdout = io.StringIO()
+    saved_stdin = sys.stdin
+    sys.stdin = io.StringIO(stdin_text)
+
+    try:
+        with contextlib.redirect_stdout(stdout):
+            exec(main_code, module.__dict__)
+    finally:
+        sys.stdin = saved_stdin
+
+    return stdout.getvalue().strip()
+
+
+def read(path):
+    with open(path) as f:
+        return f.read()
@@ -0,0 +1,75 @@
+"""Reduced density matrices of state vectors, by partial trace over the state tensor.
+
+``qml.density_matrix`` on "default.qubit" needs the whole circuit to run through the
+device; given a state vector, a reduced density matrix only needs the contraction
+
+    rho[i, j] = sum_e psi[i, e] * conj(psi[j, e])
+
+over the traced-out wires e. ``reduced_density_matrix`` reshapes the state into one axis
+per wire and contracts it with ``np.einsum`` in blocks, so the only copies it makes are of
+at most ``max_entries`` amplitudes, whatever the number of wires::
+
+    state = qnode()  # returns qml.state()
+    rho = density.reduced_density_matrix(state, [1])
+
+Wire 0 is the most significant bit, as in PennyLane.
+"""
+
+import itertools
+
+import numpy as np
+
+
+def n_wires_of(state):
+    """Number of wires of a state vector, checking that its length is a power of two."""
+
+    n_wires = int(np.log2(len(state)))
+    if len(state) != 2**n_wires:
+        raise ValueError(f"a state vector has 2^n amplitudes, not {len(state)}")
+    return n_wires
+
+
+def reduced_density_matrix(state, keep, max_entries=2**20):
+    """Density matrix of some wires of a pure state, the others being traced out.
+
+    Args:
+        - state (np.ndarray): state vector of 2^n amplitudes
+        - keep (list(int)): wires to keep, in the order of the rows of the result
+        - max_entries (int): largest number of amplitudes copied at once
+
+    Returns:
+        - (np.ndarray): the 2^len(keep) x 2^len(keep) reduced density matrix
+    """
+
+    state = np.asarray(state)
+    n_wires = n_wires_of(state)
+    keep = list(keep)
+    if len(set(keep)) != len(keep) or any(not 0 <= w < n_wires for w in keep):
+        raise ValueError(f"wires to keep must be distinct wires of the {n_wires}-wire state, got {keep}")
+
+    tensor = state.reshape((2,) * n_wires)
+    traced = [w for w in range(n_wires) if w not in keep]
+
+    #fix the values of the first traced wires, one block at a time, so that each block holds
+    #at most max_entries amplitudes; the other traced wires are summed by einsum
+    n_fixed = min(len(traced), max(0, n_wires - int(np.log2(max(max_entries, 1)))))
+    fixed = traced[:n_fixed]
+    axes = [w for w in range(n_wires) if w not in fixed]
+    #einsum labels: the position of each axis of the block in the ket, and a new label for the
+    #kept wires in the bra
+    ket = {w: k for k, w in enumerate(axes)}
+    bra = {w: len(axes) + k for k, w in enumerate(keep)}
+    ket_axes = list(range(len(axes)))
+    bra_axes = [bra.get(w, ket[w]) for w in axes]
+    output = [ket[w] for w in keep] + [bra[w] for w in keep]
+
+    dim = 2 ** len(keep)
+    rho = np.zeros((dim, dim), dtype=np.result_type(state.dtype, np.complex64))
+    for values in itertools.product((0, 1), repeat=n_fixed):
+        index = [slice(None)] * n_wires
+        for w, value in zip(fixed, values):
+            index[w] = value
+        block = tensor[tuple(index)]
+        rho += np.einsum(block, ket_axes, block.conj(), bra_axes, output, optimize=True).reshape(dim, dim)
+
+    return rho
@@ -0,0 +1,48 @@
+"""Deferred imports for templates that rarely touch PennyLane.
+
+``import pennylane`` takes the better part of a second, which dominates the run time of
+templates that are pure NumPy or only use ``qml`` on a rarely-hit branch. A lazy module
+stands in for the real one and imports it the first time one of its attributes is used::
+
+    qml = lazy_import("pennylane")
+
+    qml.CNOT(wires=[0, 1])  # PennyLane is imported here, not above
+"""
+
+import importlib
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    """Placeholder that imports the module it names on first attribute access."""
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self.__name__)
+        #copy the real namespace over so later lookups skip __getattr__ entirely
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+    def __dir__(self):
+        return dir(importlib.import_module(self.__name__))
+
+
+def lazy_import(name):
+    """Returns ``name`` as a module that is only imported when it is first used.
+
+    Args:
+        - name (str): absolute module name, e.g. "pennylane"
+
+    Returns:
+        - (module): the real module if it is already imported, otherwise a ``LazyModule``
+    """
+
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)
+
+
+def is_loaded(name):
+    """Whether the real module ``name`` has been imported in this process."""
+
+    return name in sys.modules
@@ -0,0 +1,142 @@
+"""Classical evaluation of oracles built from reversible classical gates.
+
+The oracles of the Deutsch-Jozsa family of challenges only use X, CNOT, Toffoli and
+similar gates, which map basis states to basis states. Once such an oracle has been
+recorded, its action on all 2^n basis states is a permutation of the integers
+0 .. 2^n - 1 that can be computed with a few NumPy bit operations per gate::
+
+    operations = oracles.record(oracle)
+    f = oracles.boolean_function(operations, [0, 1], 2)
+    if f is not None:
+        ...  # answer from the truth table f
+    else:
+        ...  # non-classical gates: simulate the circuit
+
+Wire 0 of ``wires`` is the most significant bit, as in PennyLane.
+
+On noisy devices, the classifiers also run with many shots in one device call, and
+``majority`` picks the answer most shots agree on.
+"""
+
+import numpy as np
+import pennylane as qml
+
+
+#gates whose last wire is flipped when every other wire matches its control value
+CONTROLLED_FLIPS = {"PauliX", "CNOT", "Toffoli", "MultiControlledX"}
+CLASSICAL_GATES = CONTROLLED_FLIPS | {"SWAP", "Identity"}
+
+
+def record(oracle, *args, **kwargs):
+    """Records the gates an oracle applies, without queuing them anywhere else.
+
+    Args:
+        - oracle (callable): quantum function
+        - args, kwargs: arguments for ``oracle``
+
+    Returns:
+        - (list(qml.Operation)): the gates, in order
+    """
+
+    with qml.tape.stop_recording():
+        with qml.tape.QuantumTape() as tape:
+            oracle(*args, **kwargs)
+    return tape.operations
+
+
+def is_classical(operations):
+    """Whether every gate maps basis states to basis states."""
+
+    return all(op.name in CLASSICAL_GATES for op in operations)
+
+
+def permutation(operations, wires):
+    """Action of classical gates on every basis state.
+
+    Args:
+        - operations (list(qml.Operation)): gates for which ``is_classical`` holds
+        - wires (list): all the wires the gates act on, most significant first
+
+    Returns:
+        - (np.ndarray): entry x is the basis state that basis state x is mapped to
+    """
+
+    n_wires = len(wires)
+    bit = {w: n_wires - 1 - k for k, w in enumerate(wires)}
+    states = np.arange(2**n_wires, dtype=np.int64)
+
+    for op in operations:
+        positions = [bit[w] for w in op.wires]
+
+        if op.name in CONTROLLED_FLIPS:
+            *controls, target = positions
+            values = op.hyperparameters.get("control_values") or "1" * len(controls)
+            active = np.ones(len(states), dtype=bool)
+            for position, value in zip(controls, values):
+                active &= ((states >> position) & 1) == int(value)
+            states ^= active.astype(np.int64) << target
+
+        elif op.name == "SWAP":
+            a, b = positions
+            differ = ((states >> a) ^ (states >> b)) & 1
+            states ^= (differ << a) | (differ << b)
+
+        elif op.name != "Identity":
+            raise ValueError(f"{op.name} is not a classical reversible gate")
+
+    return states
+
+
+def boolean_function(operations, input_wires, output_wire, wires=None):
+    """Truth table f of an oracle of the form |x>|y> -> |x>|y XOR f(x)>.
+
+    Args:
+        - operations (list(qml.Operation)): the recorded oracle
+        - input_wires (list): wires of x, most significant first
+        - output_wire: wire of y
+        - wires (list): every wire the oracle may touch, defaults to input_wires + [output_wire]
+
+    Returns:
+        - (np.ndarray): f(x) for every x, or None if the oracle has non-classical gates, touches
+        other wires, or is not of that form
+    """
+
+    wires = list(input_wires) + [output_wire] if wires is None else list(wires)
+    if not is_classical(operations) or any(w not in wires for op in operations for w in op.wires):
+        return None
+
+    states = permutation(operations, wires)
+    n_wires = len(wires)
+    output_bit = n_wires - 1 - wires.index(output_wire)
+    input_bits = [n_wires - 1 - wires.index(w) for w in input_wires]
+
+    #the inputs, output cleared, with any other wire in |0>
+    x = np.arange(2 ** len(input_wires))
+    basis = np.zeros_like(x)
+    for k, position in enumerate(input_bits):
+        basis |= ((x >> (len(input_bits) - 1 - k)) & 1) << position
+
+    f = (states[basis] >> output_bit) & 1
+    #the oracle must leave every other wire alone and XOR the output with f(x), for y = 1 as well
+    flipped = basis | (1 << output_bit)
+    if not (np.array_equal(states[basis] & ~(1 << output_bit), basis)
+            and np.array_equal(states[flipped], basis | ((1 - f) << output_bit))):
+        return None
+
+    return f
+
+
+def majority(answers):
+    """Most frequent answer among many shots.
+
+    Args:
+        - answers (np.ndarray): one answer per shot along the first axis, rows for answers of several bits
+
+    Returns:
+        - (np.ndarray): the most frequent answer, the smallest one on ties
+        - (float): fraction of shots that gave it
+    """
+
+    values, counts = np.unique(np.asarray(answers), axis=0, return_counts=True)
+    best = int(np.argmax(counts))
+    return values[best], counts[best] / counts.sum()
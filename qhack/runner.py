@@ -0,0 +1,176 @@
+"""Runs every challenge template against its ``N.in`` / ``N.ans`` fixtures.
+
+Usage::
+
+    python -m qhack.runner [-j JOBS] [NAME ...]
+
+Packages the templates import eagerly (PennyLane for most of them) are imported once in
+the parent process and inherited by the workers, and each worker imports a template at
+most once, so the per-input cost is only the template's ``__main__`` logic itself.
+"""
+
+import argparse
+import concurrent.futures
+import importlib
+import math
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+
+from qhack import challenges
+
+
+DEFAULT_TOLERANCE = 1e-5
+
+#absolute / relative tolerance used when comparing numerical outputs with the expected answers
+TOLERANCES = {
+    "algorithms_400_QuantumCounting_template": 1e-3,
+    "games_200_CHSH_template": 1e-4,
+    "games_300_Elitzur_Vaidman_template": 0.05,
+    "pennylane101_400_FiniteDifferenceGradient_template": 1e-4,
+    "qchem_300_Universality_Givens_template": 1e-4,
+    "qchem_500_MindTheGap_template": 1e-3,
+    "qml_100_GeneratingFourierState_template": 1e-3,
+    "qml_500_UDMIS_template": 1e-4,
+}
+
+#challenges graded on the fraction of output tokens that match the answer rather than on all of them
+MATCH_FRACTIONS = {
+    "qml_300_IsingOnTheCake_template": 0.9,
+}
+
+
+def _tokens(text):
+    return [t.strip() for t in text.strip().split(",") if t.strip() != ""]
+
+
+def _same_token(output, expected, tolerance):
+    try:
+        return math.isclose(float(output), float(expected), rel_tol=tolerance, abs_tol=tolerance)
+    except ValueError:
+        return output == expected
+
+
+def compare(name, output, expected):
+    """Checks a template's output against the expected answer.
+
+    Args:
+        - name (str): challenge name, used to look up its tolerance
+        - output (str): what the template printed
+        - expected (str): contents of the ``.ans`` file
+
+    Returns:
+        - (bool): whether the output is accepted
+    """
+
+    output, expected = _tokens(output), _tokens(expected)
+    if len(output) != len(expected):
+        return False
+
+    tolerance = TOLERANCES.get(name, DEFAULT_TOLERANCE)
+    matches = [_same_token(o, e, tolerance) for o, e in zip(output, expected)]
+
+    if name in MATCH_FRACTIONS:
+        return sum(matches) >= MATCH_FRACTIONS[name] * len(matches)
+    return all(matches)
+
+
+def run_case(challenge, case):
+    """Runs a single fixture and grades it.
+
+    Args:
+        - challenge (challenges.Challenge): the challenge the fixture belongs to
+        - case (challenges.Case): the fixture to run
+
+    Returns:
+        - (dict): challenge and case names, status ("pass", "fail" or "error"), output and wall time
+    """
+
+    result = {"challenge": challenge.name, "case": case.name, "output": None}
+    start = time.perf_counter()
+
+    try:
+        output = challenges.run_main(challenge, challenges.read(case.input_path))
+    except Exception:
+        result["status"] = "error"
+        result["output"] = traceback.format_exc()
+    else:
+        result["output"] = output
+        if case.answer_path is None:
+            result["status"] = "pass"
+        else:
+            expected = challenges.read(case.answer_path)
+            result["status"] = "pass" if compare(challenge.name, output, expected) else "fail"
+
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def warm_up(selected):
+    """Imports the packages the selected templates load eagerly, so forked workers inherit them.
+
+    Pure-NumPy templates and templates that import PennyLane through ``qhack.lazy`` do not
+    pull PennyLane into the parent process.
+
+    Args:
+        - selected (list(challenges.Challenge)): challenges about to be run
+    """
+
+    for name in sorted(set().union(*(challenges.eager_imports(c) for c in selected))):
+        importlib.import_module(name)
+
+
+def run(selected, jobs=None):
+    """Runs all the fixtures of the selected challenges in a process pool.
+
+    Args:
+        - selected (list(challenges.Challenge)): challenges to run
+        - jobs (int): number of worker processes, defaults to the CPU count. 1 runs everything in-process
+
+    Returns:
+        - (list(dict)): one result per fixture, in discovery order
+    """
+
+    tasks = [(challenge, case) for challenge in selected for case in challenge.cases]
+    jobs = jobs or os.cpu_count() or 1
+
+    if jobs == 1:
+        return [run_case(*task) for task in tasks]
+
+    warm_up(selected)
+    context = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else None)
+
+    with concurrent.futures.ProcessPoolExecutor(
+        jobs, mp_context=context, initializer=warm_up, initargs=(selected,)
+    ) as pool:
+        futures = [pool.submit(run_case, *task) for task in tasks]
+        return [future.result() for future in futures]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", help="only run challenges whose name contains one of these")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="number of worker processes")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print the output of failing cases")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = run(challenges.discover(names=args.names), args.jobs)
+
+    for result in results:
+        print(f"{result['status'].upper():5} {result['challenge']}/{result['case']} ({result['seconds']:.2f}s)")
+        if args.verbose and result["status"] != "pass":
+            print(result["output"])
+
+    failed = [r for r in results if r["status"] != "pass"]
+    print(
+        f"{len(results) - len(failed)} passed, {len(failed)} failed "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,317 @@
+"""Stabilizer (CHP tableau) simulator as a PennyLane device.
+
+Circuits made of Clifford gates only (H, S, X, Y, Z, CNOT, CZ, SWAP, and rotations by
+multiples of pi/2) keep the state a stabilizer state, which is described by 2n Pauli
+operators instead of 2^n amplitudes. Following Aaronson and Gottesman, every gate costs
+O(n) and a measurement O(n^2), so the Deutsch-Jozsa family of circuits can run on hundreds
+of qubits::
+
+    from qhack import cache
+
+    qnode = cache.qnode(circuit, "qhack.stabilizer", wires=300, shots=1)
+
+Toffoli and MultiControlledX gates are accepted when they reduce to Clifford gates on the
+current state: when a control is known to be |0> or |1>, or when the target is known to be
+|+> or |->, as it is in a phase oracle. Anything else raises ``qml.DeviceError``.
+
+Computational-basis outcomes of a stabilizer state are uniformly distributed over an affine
+subspace, so samples and probabilities of a few wires are produced without a state vector.
+``qml.state()`` and density matrices are not supported.
+"""
+
+import numpy as np
+import pennylane as qml
+
+
+class Tableau:
+    """Stabilizer tableau of n qubits, initially |0...0>.
+
+    Rows 0..n-1 are destabilizers, rows n..2n-1 stabilizers and row 2n is scratch space.
+    Row i stands for the Pauli operator (-1)^r[i] prod_j X_j^x[i, j] Z_j^z[i, j].
+    """
+
+    def __init__(self, n_qubits):
+        self.n = n_qubits
+        self.x = np.zeros((2 * n_qubits + 1, n_qubits), dtype=np.uint8)
+        self.z = np.zeros((2 * n_qubits + 1, n_qubits), dtype=np.uint8)
+        self.r = np.zeros(2 * n_qubits + 1, dtype=np.uint8)
+        self.x[np.arange(n_qubits), np.arange(n_qubits)] = 1
+        self.z[np.arange(n_qubits) + n_qubits, np.arange(n_qubits)] = 1
+
+    def copy(self):
+        other = Tableau.__new__(Tableau)
+        other.n, other.x, other.z, other.r = self.n, self.x.copy(), self.z.copy(), self.r.copy()
+        return other
+
+    def h(self, a):
+        self.r ^= self.x[:, a] & self.z[:, a]
+        self.x[:, a], self.z[:, a] = self.z[:, a].copy(), self.x[:, a].copy()
+
+    def s(self, a):
+        self.r ^= self.x[:, a] & self.z[:, a]
+        self.z[:, a] ^= self.x[:, a]
+
+    def cnot(self, a, b):
+        self.r ^= self.x[:, a] & self.z[:, b] & (self.x[:, b] ^ self.z[:, a] ^ 1)
+        self.x[:, b] ^= self.x[:, a]
+        self.z[:, a] ^= self.z[:, b]
+
+    def pauli_x(self, a):
+        self.r ^= self.z[:, a]
+
+    def pauli_z(self, a):
+        self.r ^= self.x[:, a]
+
+    def pauli_y(self, a):
+        self.r ^= self.x[:, a] ^ self.z[:, a]
+
+    def _rowsum(self, h, i):
+        #h may be an array of rows that are all multiplied by row i
+        x1, z1 = self.x[i].astype(np.int64), self.z[i].astype(np.int64)
+        x2, z2 = self.x[h].astype(np.int64), self.z[h].astype(np.int64)
+        #exponent of i picked up when multiplying the single-qubit Paulis, qubit by qubit
+        g = np.where(
+            x1 & z1, z2 - x2, np.where(x1, z2 * (2 * x2 - 1), np.where(z1, x2 * (1 - 2 * z2), 0))
+        )
+        total = 2 * self.r[h].astype(np.int64) + 2 * int(self.r[i]) + g.sum(axis=-1)
+        self.r[h] = (total % 4 == 2).astype(np.uint8)
+        self.x[h] ^= self.x[i]
+        self.z[h] ^= self.z[i]
+
+    def _random_row(self, a):
+        rows = np.flatnonzero(self.x[self.n : 2 * self.n, a])
+        return int(rows[0]) + self.n if len(rows) else None
+
+    def peek(self, a):
+        """Outcome of measuring qubit a in the Z basis if it is certain, else None. The state is unchanged."""
+
+        if self._random_row(a) is not None:
+            return None
+
+        scratch = 2 * self.n
+        self.x[scratch], self.z[scratch], self.r[scratch] = 0, 0, 0
+        for i in np.flatnonzero(self.x[: self.n, a]):
+            self._rowsum(scratch, int(i) + self.n)
+        return int(self.r[scratch])
+
+    def measure(self, a, rng):
+        """Measures qubit a in the Z basis, collapsing the state.
+
+        Returns:
+            - (int): the outcome
+            - (bool): whether it was random
+        """
+
+        p = self._random_row(a)
+        if p is None:
+            return self.peek(a), False
+
+        others = np.array([i for i in np.flatnonzero(self.x[: 2 * self.n, a]) if i != p])
+        if len(others):
+            self._rowsum(others, p)
+
+        outcome = int(rng.integers(2))
+        self.x[p - self.n], self.z[p - self.n], self.r[p - self.n] = self.x[p], self.z[p], self.r[p]
+        self.x[p], self.z[p] = 0, 0
+        self.z[p, a] = 1
+        self.r[p] = outcome
+        return outcome, True
+
+    def support(self, rng):
+        """Computational-basis outcomes as an affine subspace.
+
+        Returns:
+            - (np.ndarray): one possible outcome, a bit per qubit
+            - (np.ndarray): rows spanning the differences between outcomes
+        """
+
+        collapsed = self.copy()
+        outcome = np.array([collapsed.measure(a, rng)[0] for a in range(self.n)], dtype=np.uint8)
+        return outcome, self.x[self.n : 2 * self.n].copy()
+
+
+def _row_basis(rows):
+    #GF(2) row echelon form, keeping only the independent rows
+    rows = rows.copy()
+    basis, column = [], 0
+    for column in range(rows.shape[1]):
+        pivots = np.flatnonzero(rows[:, column])
+        if not len(pivots):
+            continue
+        pivot = rows[pivots[0]].copy()
+        rows[pivots] ^= pivot
+        basis.append(pivot)
+    return np.array(basis, dtype=np.uint8).reshape(-1, rows.shape[1])
+
+
+class StabilizerDevice(qml.QubitDevice):
+    """PennyLane device simulating Clifford circuits with a stabilizer tableau.
+
+    Args:
+        - wires (int or iterable): number of wires or wire labels
+        - shots (int): number of shots, None for analytic probabilities and expectation values
+        - seed (int): seed of the measurement outcomes
+    """
+
+    name = "Stabilizer tableau simulator"
+    short_name = "qhack.stabilizer"
+    pennylane_requires = ">=0.22"
+    version = "0.1.0"
+    author = "QHack 2022 solutions"
+
+    operations = {
+        "Identity", "Hadamard", "PauliX", "PauliY", "PauliZ", "S", "SX", "CNOT", "CZ", "CY", "SWAP",
+        "RX", "RY", "RZ", "PhaseShift", "Toffoli", "MultiControlledX",
+    }
+    #the Hadamard observable is diagonalised by RY(-pi/4), which is not a Clifford gate
+    observables = {"PauliX", "PauliY", "PauliZ", "Identity"}
+
+    def __init__(self, wires, shots=None, seed=None):
+        super().__init__(wires, shots)
+        self._rng = np.random.default_rng(seed)
+        self._tableau = Tableau(self.num_wires)
+
+    @classmethod
+    def capabilities(cls):
+        capabilities = super().capabilities().copy()
+        capabilities.update(supports_inverse_operations=True, returns_state=False)
+        return capabilities
+
+    def reset(self):
+        self._tableau = Tableau(self.num_wires)
+        self._samples = None
+
+    def apply(self, operations, rotations=None, **kwargs):
+        for op in list(operations) + list(rotations or []):
+            self._apply_operation(op)
+
+    def _quarter_turns(self, op):
+        turns = float(op.parameters[0]) / (np.pi / 2)
+        if not np.isclose(turns, round(turns), atol=1e-9):
+            raise qml.DeviceError(f"{op.name}({op.parameters[0]}) is not a Clifford gate")
+        turns = round(turns) % 4
+        return (4 - turns) % 4 if op.inverse else turns
+
+    def _apply_operation(self, op):
+        t = self._tableau
+        wires = self.map_wires(op.wires).tolist()
+        name = op.name[:-4] if op.name.endswith(".inv") else op.name
+
+        if name == "Identity":
+            return
+        if name == "Hadamard":
+            t.h(wires[0])
+        elif name == "PauliX":
+            t.pauli_x(wires[0])
+        elif name == "PauliY":
+            t.pauli_y(wires[0])
+        elif name == "PauliZ":
+            t.pauli_z(wires[0])
+        elif name == "S":
+            for _ in range(3 if op.inverse else 1):
+                t.s(wires[0])
+        elif name == "SX":
+            t.h(wires[0])
+            for _ in range(3 if op.inverse else 1):
+                t.s(wires[0])
+            t.h(wires[0])
+        elif name in ("RZ", "PhaseShift"):
+            #equal to S^k up to a global phase
+            for _ in range(self._quarter_turns(op)):
+                t.s(wires[0])
+        elif name == "RX":
+            t.h(wires[0])
+            for _ in range(self._quarter_turns(op)):
+                t.s(wires[0])
+            t.h(wires[0])
+        elif name == "RY":
+            #RY = S RX S^dagger
+            turns = self._quarter_turns(op)
+            for _ in range(3):
+                t.s(wires[0])
+            t.h(wires[0])
+            for _ in range(turns):
+                t.s(wires[0])
+            t.h(wires[0])
+            t.s(wires[0])
+        elif name == "CNOT":
+            t.cnot(*wires)
+        elif name == "CZ":
+            t.h(wires[1])
+            t.cnot(*wires)
+            t.h(wires[1])
+        elif name == "CY":
+            for _ in range(3):
+                t.s(wires[1])
+            t.cnot(*wires)
+            t.s(wires[1])
+        elif name == "SWAP":
+            t.cnot(wires[0], wires[1])
+            t.cnot(wires[1], wires[0])
+            t.cnot(wires[0], wires[1])
+        elif name in ("Toffoli", "MultiControlledX"):
+            values = op.hyperparameters.get("control_values") or "1" * (len(wires) - 1)
+            self._controlled_x(wires[:-1], wires[-1], values)
+        else:
+            raise qml.DeviceError(f"{op.name} is not supported by {self.short_name}")
+
+    def _controlled_x(self, controls, target, values):
+        t = self._tableau
+        flipped = [c for c, v in zip(controls, values) if v == "0"]
+        for c in flipped:
+            t.pauli_x(c)
+
+        try:
+            remaining = []
+            for c in controls:
+                outcome = t.peek(c)
+                if outcome == 0:
+                    return
+                if outcome is None:
+                    remaining.append(c)
+
+            if len(remaining) <= 1:
+                if remaining:
+                    t.cnot(remaining[0], target)
+                else:
+                    t.pauli_x(target)
+                return
+
+            #a target in |+> is unchanged, and a target in |-> kicks back a phase on the controls
+            t.h(target)
+            phase = t.peek(target)
+            t.h(target)
+            if phase == 0:
+                return
+            if phase == 1 and len(remaining) == 2:
+                t.h(remaining[1])
+                t.cnot(remaining[0], remaining[1])
+                t.h(remaining[1])
+                return
+            raise qml.DeviceError("the controlled X gate does not act as a Clifford gate on this state")
+        finally:
+            for c in flipped:
+                t.pauli_x(c)
+
+    def analytic_probability(self, wires=None):
+        wires = self.wires if wires is None else wires
+        indices = self.map_wires(qml.wires.Wires(wires)).tolist()
+
+        #the outcomes of these wires are uniform over outcome + span(rows)
+        outcome, rows = self._tableau.support(self._rng)
+        basis = _row_basis(rows[:, indices])
+        weights = 2 ** np.arange(len(indices) - 1, -1, -1)
+
+        reachable = {int(outcome[indices] @ weights)}
+        for row in basis:
+            shift = int(row @ weights)
+            reachable |= {value ^ shift for value in reachable}
+
+        probabilities = np.zeros(2 ** len(indices))
+        probabilities[sorted(reachable)] = 1 / len(reachable)
+        return probabilities
+
+    def generate_samples(self):
+        outcome, rows = self._tableau.support(self._rng)
+        coefficients = self._rng.integers(0, 2, size=(self.shots, len(rows)), dtype=np.int64)
+        return (outcome ^ (coefficients @ rows.astype(np.int64)) % 2).astype(np.int64)